@@ -0,0 +1,2 @@
+from .synthetic_data_module import SyntheticDataGenerator
+from .benchmark_module import BenchmarkSuite
@@ -0,0 +1,33 @@
+import sys
+
+from benchmark import BenchmarkSuite
+from benchmark.benchmark_module import ALGORITHMS
+
+'''
+Config variables
+'''
+n_assets = 4
+years = 3
+algorithms = ALGORITHMS
+simulation_days = 10
+output_path = 'files/benchmark.json'
+
+'''
+Usage: python -m benchmark [output.json] [baseline.json]
+'''
+if len(sys.argv) > 1:
+    output_path = sys.argv[1]
+
+suite = BenchmarkSuite(n_assets=n_assets, years=years, algorithms=algorithms, simulation_days=simulation_days)
+suite.run()
+suite.save(output_path)
+print(f"Benchmark results written to {output_path}")
+if suite.mismatches():
+    print(f"Parallel runs differ from the serial run: {suite.mismatches()}")
+    sys.exit(1)
+
+if len(sys.argv) > 2:
+    comparison = BenchmarkSuite.compare(sys.argv[2], output_path)
+    print(comparison.to_string(index=False))
+    if comparison['regression'].any():
+        sys.exit(1)
@@ -0,0 +1,240 @@
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmark.synthetic_data_module import SyntheticDataGenerator
+from decision import DecisionManager
+from feature import FeatureEngineeringModule
+from ingestion import DataIngestionModule
+from simulation import Simulator
+from simulation.forecast_module import build_model, lstm_feature_cols
+from utils.logging_module import EventLogger, flush_logging
+
+_logger = EventLogger('benchmark')
+
+'''
+Config params
+'''
+ALGORITHMS = ['RANDOM', 'SHIFT', 'AR', 'ARIMA', 'LSTM']
+MODEL_REPEATS = 3
+DECISION_CALLS = 10000
+SIMULATION_DAYS = 10
+REGRESSION_THRESHOLD = 1.2
+
+
+def _timed(fn, repeats=1):
+    """Runs fn repeats times with stdout silenced and returns (min seconds, last result)."""
+    times, result = [], None
+    # Queued records must reach the console before stdout is silenced
+    flush_logging()
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+class BenchmarkSuite:
+    """
+    Times every stage of the pipeline on synthetic data (see SyntheticDataGenerator): ingestion, feature
+    engineering, train/predict of each model, DecisionManager and Simulator.run. Results are a list of
+    {stage, name, seconds, ...} records that save() writes to JSON next to the environment description, so
+    runs of different versions can be checked with compare().
+    """
+
+    def __init__(self, n_assets=4, years=3, algorithms=None, simulation_days=SIMULATION_DAYS,
+                 model_repeats=MODEL_REPEATS, decision_calls=DECISION_CALLS, seed=0, use_logs=True):
+        self.n_assets = n_assets
+        self.years = years
+        self.algorithms = algorithms or ALGORITHMS
+        self.simulation_days = simulation_days
+        self.model_repeats = model_repeats
+        self.decision_calls = decision_calls
+        self.seed = seed
+        self.use_logs = use_logs
+        self.results = []
+
+    def _record(self, stage, name, seconds, **extra):
+        self.results.append({'stage': stage, 'name': name, 'seconds': seconds, **extra})
+        self._log("[benchmark] %s/%s: %.4fs %s", stage, name, seconds, extra if extra else '', event='benchmark',
+                  stage=stage, name=name, seconds=seconds, **extra)
+
+    def run(self):
+        self.results = []
+        generator = SyntheticDataGenerator(self.n_assets, self.years, seed=self.seed)
+        with tempfile.TemporaryDirectory() as data_dir:
+            asset_files, sentiment_files, macro_files = generator.write(data_dir)
+            df = self.bench_ingestion(data_dir, asset_files, sentiment_files, macro_files)
+        df = self.bench_features(df, generator.assets)
+        self.bench_models(df, generator.assets[0])
+        self.bench_decisions()
+        self.bench_simulation(df, generator.assets)
+        self.bench_parallel(df, generator.assets)
+        return self.results
+
+    def bench_ingestion(self, data_dir, asset_files, sentiment_files, macro_files):
+        ingestor = DataIngestionModule(data_dir=data_dir, use_logs=False)
+
+        def load():
+            ingestor.ingest_sentiment_data(sentiment_files)
+            ingestor.ingest_macro_data(macro_files)
+            ingestor.ingest_asset_data(asset_files)
+
+        seconds, _ = _timed(load)
+        self._record('ingestion', 'load_csv', seconds, files=len(asset_files) + len(sentiment_files) + len(macro_files))
+        seconds, df = _timed(ingestor.align_all_data)
+        self._record('ingestion', 'align_all_data', seconds, rows=len(df), columns=df.shape[1])
+        return df
+
+    def bench_features(self, df, assets):
+        # scale_standard imports scikit-learn on first use; load it beforehand so only the work is timed
+        import sklearn.preprocessing
+
+        def engineer():
+            feature_module = FeatureEngineeringModule(df)
+            feature_module.apply_to_all_assets(assets)
+            feature_module.scale_standard()
+            return feature_module.remove_na_rows()
+
+        seconds, featured = _timed(engineer)
+        self._record('features', 'feature_engineering', seconds, rows=len(featured), columns=featured.shape[1])
+        return featured
+
+    def bench_models(self, df, asset):
+        target_col = f"{asset}_value"
+        for algorithm_type in self.algorithms:
+            model = build_model(algorithm_type, {'use_logs': False})
+            if algorithm_type == 'SHIFT':
+                train = lambda: model.train(asset, df)
+                predict = lambda: model.predict(asset, df)
+            elif algorithm_type == 'AR':
+                train = lambda: model.train_all(df, [asset])
+                predict = lambda: model.predict(asset)
+            elif algorithm_type == 'LSTM':
+                feature_cols = lstm_feature_cols(asset, df.columns)
+                train = lambda: model.train(df, feature_cols=feature_cols, target_col=target_col)
+                predict = lambda: model.predict(df)
+            else:
+                train = lambda: model.train(df, target_col=target_col)
+                predict = lambda: model.predict(horizon=1)
+            seconds, _ = _timed(train, self.model_repeats)
+            self._record('model', f"{algorithm_type}.train", seconds, rows=len(df))
+            seconds, _ = _timed(predict, self.model_repeats)
+            self._record('model', f"{algorithm_type}.predict", seconds, rows=len(df))
+
+    def bench_decisions(self):
+        rng = np.random.default_rng(self.seed)
+        assets = [f"asset_{i}" for i in range(self.n_assets)]
+        n_days = self.decision_calls // len(assets)
+        returns = rng.normal(0, 0.02, (n_days, len(assets)))
+        current = 100 * np.exp(np.cumsum(returns, axis=0))
+        predicted = current * (1 + rng.normal(0, 0.03, current.shape))
+        decision_manager = DecisionManager(tp_min=0.01, tp_max=0.05, sl_min=0.0, sl_max=0.05, use_logs=False)
+
+        def decide_each():
+            portfolio = {asset: {'quantity': 10, 'avg_price': 100.0} for asset in assets}
+            for day in range(n_days):
+                for i, asset in enumerate(assets):
+                    decision_manager.decide_action(asset, predicted[day, i], current[day, i], 100000, portfolio)
+
+        calls = n_days * len(assets)
+        seconds, _ = _timed(decide_each)
+        self._record('decision', 'decide_action', seconds, calls=calls, per_call=seconds / calls)
+        seconds, _ = _timed(lambda: decision_manager.decide_batch(predicted, current, 100000))
+        self._record('decision', 'decide_batch', seconds, calls=calls, per_call=seconds / calls)
+
+    def bench_simulation(self, df, assets):
+        end_date = df['timestamp'].iloc[-1]
+        start_date = end_date - pd.Timedelta(days=self.simulation_days - 1)
+        for algorithm_type in self.algorithms:
+            simulator = Simulator(
+                simulation_list=list(assets), df=df, initial_liquidity=100000, algorithm_type=algorithm_type,
+                sl_min=0.0, sl_max=0.05, tp_min=0.01, tp_max=0.05, operate_in_weekends=True, use_logs=False,
+                model_params={'use_logs': False}
+            )
+            seconds, _ = _timed(lambda: simulator.run(start_date, end_date))
+            days = len(simulator.simulated_dates)
+            self._record('simulation', f"{algorithm_type}.run", seconds, days=days,
+                         per_day=seconds / days if days else None)
+
+    def bench_parallel(self, df, assets):
+        """
+        Seeded RANDOM runs in serial, thread and process mode. Their ledgers must be identical; the record of
+        each parallel mode carries identical=True/False next to its time.
+        """
+        end_date = df['timestamp'].iloc[-1]
+        start_date = end_date - pd.Timedelta(days=self.simulation_days - 1)
+        ledgers = {}
+        for mode in ('serial', 'thread', 'process'):
+            simulator = Simulator(
+                simulation_list=list(assets), df=df, initial_liquidity=100000, algorithm_type='RANDOM',
+                sl_min=0.0, sl_max=0.05, tp_min=0.01, tp_max=0.05, operate_in_weekends=True, use_logs=False,
+                model_params={'use_logs': False, 'seed': self.seed}, parallel=mode != 'serial',
+                executor='thread' if mode == 'serial' else mode
+            )
+            seconds, _ = _timed(lambda: simulator.run(start_date, end_date))
+            ledgers[mode] = simulator.transactions.to_frame()
+            extra = {} if mode == 'serial' else {'identical': bool(ledgers[mode].equals(ledgers['serial']))}
+            self._record('parallel', f"RANDOM.{mode}", seconds, trades=len(ledgers[mode]), **extra)
+
+    def mismatches(self):
+        """Records of runs whose results differ from the serial run."""
+        return [result for result in self.results if result.get('identical') is False]
+
+    @staticmethod
+    def environment():
+        try:
+            commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True).stdout.strip()
+        except OSError:
+            commit = None
+        return {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'commit': commit or None,
+            'timestamp': pd.Timestamp.now().isoformat(),
+        }
+
+    def save(self, path):
+        config = {
+            'n_assets': self.n_assets,
+            'years': self.years,
+            'algorithms': self.algorithms,
+            'simulation_days': self.simulation_days,
+            'model_repeats': self.model_repeats,
+            'decision_calls': self.decision_calls,
+            'seed': self.seed,
+        }
+        with open(path, 'w') as f:
+            json.dump({'environment': self.environment(), 'config': config, 'results': self.results}, f, indent=2,
+                      default=float)
+
+    @staticmethod
+    def compare(baseline_path, current_path, threshold=REGRESSION_THRESHOLD):
+        """
+        Compares two saved runs stage by stage; stages that got slower than threshold times are flagged.
+        """
+        with open(baseline_path) as f:
+            baseline = {(r['stage'], r['name']): r['seconds'] for r in json.load(f)['results']}
+        with open(current_path) as f:
+            current = {(r['stage'], r['name']): r['seconds'] for r in json.load(f)['results']}
+        rows = []
+        for key in baseline.keys() & current.keys():
+            ratio = current[key] / baseline[key] if baseline[key] > 0 else float('inf')
+            rows.append({'stage': key[0], 'name': key[1], 'baseline': baseline[key], 'current': current[key],
+                         'ratio': ratio, 'regression': ratio > threshold})
+        columns = ['stage', 'name', 'baseline', 'current', 'ratio', 'regression']
+        return pd.DataFrame(rows, columns=columns).sort_values(['stage', 'name']).reset_index(drop=True)
+
+    def _log(self, msg, *args, **fields):
+        if self.use_logs:
+            _logger.info(msg, *args, **fields)
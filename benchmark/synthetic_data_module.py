@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+'''
+Config params
+'''
+MACRO_INDICATORS = [
+    'usa_gdp', 'usa_inflation', 'usa_unemployment', 'usa_interest_rate',
+    'euro_gdp', 'euro_inflation', 'euro_unemployment', 'euro_interest_rate',
+]
+DAILY_VOLATILITY = 0.02
+SENTIMENT_COVERAGE = 0.3
+
+
+class SyntheticDataGenerator:
+    """
+    Writes random price, sentiment and macro CSVs with the same layout as input/:
+    historic/<asset>.csv (timestamp, value, volume), sentiment/<asset>.csv (timestamp, sentiment) and
+    macro/<indicator>.csv (timestamp, value), one row per calendar day. Price and macro files are written newest
+    first, like the real ones.
+    """
+
+    def __init__(self, n_assets=4, years=3, start_date='2015-01-01', seed=0):
+        self.n_assets = n_assets
+        self.years = years
+        self.start_date = pd.Timestamp(start_date)
+        self.rng = np.random.default_rng(seed)
+        self.assets = [f"asset_{i}" for i in range(n_assets)]
+
+    def dates(self):
+        end_date = self.start_date + pd.DateOffset(years=self.years) - pd.Timedelta(days=1)
+        return pd.date_range(self.start_date, end_date, freq='D')
+
+    def _prices(self, n_days):
+        returns = self.rng.normal(0.0003, DAILY_VOLATILITY, n_days)
+        start_price = self.rng.uniform(10, 500)
+        return np.round(start_price * np.exp(np.cumsum(returns)), 2)
+
+    def _sentiment(self, n_days):
+        sentiment = np.round(self.rng.uniform(-1, 1, n_days), 3)
+        sentiment[self.rng.random(n_days) > SENTIMENT_COVERAGE] = 0.0
+        return sentiment
+
+    def _macro(self, dates):
+        # Monthly releases held constant until the next one
+        months = dates.to_period('M')
+        levels = pd.Series(np.round(self.rng.normal(2, 1, len(months.unique())), 2), index=months.unique())
+        return levels.reindex(months).to_numpy()
+
+    def write(self, data_dir):
+        """
+        Writes the CSVs under data_dir and returns the file maps for DataIngestionModule:
+        (asset_files, sentiment_files, macro_files), with paths relative to data_dir.
+        """
+        dates = self.dates()
+        n_days = len(dates)
+        for sub_dir in ('historic', 'sentiment', 'macro'):
+            os.makedirs(os.path.join(data_dir, sub_dir), exist_ok=True)
+
+        asset_files, sentiment_files, macro_files = {}, {}, {}
+        for asset in self.assets:
+            historic = pd.DataFrame({
+                'timestamp': dates.strftime('%Y-%m-%d'),
+                'value': self._prices(n_days),
+                'volume': np.round(self.rng.lognormal(16, 0.5, n_days)),
+            })
+            asset_files[asset] = os.path.join('historic', f"{asset}.csv")
+            historic.iloc[::-1].to_csv(os.path.join(data_dir, asset_files[asset]), index=False)
+
+            sentiment = pd.DataFrame({'timestamp': dates.strftime('%Y-%m-%d'), 'sentiment': self._sentiment(n_days)})
+            sentiment_files[asset] = os.path.join('sentiment', f"{asset}.csv")
+            sentiment.to_csv(os.path.join(data_dir, sentiment_files[asset]), index=False)
+
+        for indicator in MACRO_INDICATORS:
+            macro = pd.DataFrame({'timestamp': dates.strftime('%Y-%m-%d'), 'value': self._macro(dates)})
+            macro_files[indicator] = os.path.join('macro', f"{indicator}.csv")
+            macro.iloc[::-1].to_csv(os.path.join(data_dir, macro_files[indicator]), index=False)
+
+        return asset_files, sentiment_files, macro_files
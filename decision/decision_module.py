@@ -1,5 +1,7 @@
 import random
 
+import numpy as np
+
 
 class DecisionManager:
     """
@@ -8,6 +10,10 @@ class DecisionManager:
     - FIXED_PERCENT: Always buys the same based on fixed_pct variable
     - RANDOM: Buys a random percent
     - FIXED: True fixed
+
+    decide_action evaluates one asset against a dict portfolio. decide_batch evaluates whole days (or many days)
+    of forecasts given as arrays, with the portfolio as quantity/avg_price arrays per asset. decide_paths
+    evaluates one asset on one day for many independent portfolios at once.
     """
 
     def __init__(self, tp_min, tp_max, sl_min, sl_max, reserve=0.1, use_logs=True, strategy='PROPORTIONAL', alpha=0.5,
@@ -23,34 +29,157 @@ class DecisionManager:
         self.fixed_pct = fixed_pct
         self.fixed = fixed
 
+    def _buy_quantity(self, expected_return, current, liquidity):
+        max_liquidity = liquidity * (1 - self.reserve)
+        quantity = 0
+        if self.strategy == 'PROPORTIONAL':
+            quantity = int((self.alpha * expected_return) * (max_liquidity // current))
+            quantity = max(quantity, 0)
+        elif self.strategy == 'FIXED_PERCENT':
+            quantity = int((self.fixed_pct * max_liquidity) // current)
+        elif self.strategy == 'FIXED':
+            quantity = int(self.fixed // current)
+        elif self.strategy == 'RANDOM':
+            random_pct = random.uniform(0.05, 0.5)
+            quantity = int((random_pct * max_liquidity) // current)
+        return quantity
+
+    def _should_sell(self, current, avg_price):
+        current_perf = (current - avg_price) / avg_price
+        return current_perf <= -self.sl_max or current_perf >= self.tp_max
+
     def decide_action(self, asset, predicted, current, liquidity, portfolio):
         expected_return = (predicted - current) / current
         action = {'type': None, 'quantity': 0, 'price': current}
 
         if expected_return > self.tp_min:
-            max_liquidity = liquidity * (1 - self.reserve)
-            quantity = 0
-            if self.strategy == 'PROPORTIONAL':
-                quantity = int((self.alpha * expected_return) * (max_liquidity // current))
-                quantity = max(quantity, 0)
-            elif self.strategy == 'FIXED_PERCENT':
-                quantity = int((self.fixed_pct * max_liquidity) // current)
-            elif self.strategy == 'FIXED':
-                quantity = int(self.fixed // current)
-            elif self.strategy == 'RANDOM':
-                random_pct = random.uniform(0.05, 0.5)
-                quantity = int((random_pct * max_liquidity) // current)
-
+            quantity = self._buy_quantity(expected_return, current, liquidity)
             if quantity > 0:
                 action.update({'type': 'buy', 'quantity': quantity})
                 return action
 
         if asset in portfolio:
             entry = portfolio[asset]
-            current_perf = (current - entry['avg_price']) / entry['avg_price']
-
-            if current_perf <= -self.sl_max or current_perf >= self.tp_max:
+            if self._should_sell(current, entry['avg_price']):
                 action.update({'type': 'sell', 'quantity': entry['quantity']})
                 return action
 
         return action
+
+    def decide_batch(self, predicted, current, liquidity, quantity=None, avg_price=None):
+        """
+        predicted, current: arrays of shape (assets,) for one day or (days, assets). NaN cells are skipped.
+        quantity, avg_price: held quantity and average price per asset (default: empty portfolio).
+        Cells are applied in row-major order (day by day, assets in column order) and every trade is executed
+        at the current price, so liquidity evolves exactly as with decide_action called in that order.
+        Returns a dict with 'buy' and 'sell' quantity arrays shaped like predicted and the final 'liquidity',
+        'quantity' and 'avg_price'.
+        """
+        predicted = np.asarray(predicted, dtype=float)
+        current = np.asarray(current, dtype=float)
+        shape = predicted.shape
+        predicted = predicted.reshape(-1, shape[-1])
+        current = current.reshape(-1, shape[-1])
+        n_assets = shape[-1]
+        quantity = np.zeros(n_assets, dtype=np.int64) if quantity is None else np.array(quantity, dtype=np.int64)
+        avg_price = np.zeros(n_assets) if avg_price is None else np.array(avg_price, dtype=float)
+
+        # Everything that does not depend on liquidity or holdings is evaluated for all cells at once
+        valid = np.isfinite(predicted) & np.isfinite(current)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            expected_return = (predicted - current) / current
+            fixed_quantity = np.floor_divide(self.fixed, current)
+        buy_signal = valid & (expected_return > self.tp_min)
+
+        buy = np.zeros(predicted.shape, dtype=np.int64)
+        sell = np.zeros(predicted.shape, dtype=np.int64)
+        held = quantity.tolist()
+        avg = avg_price.tolist()
+        prices = current.tolist()
+        returns = expected_return.tolist()
+        fixed_quantity = fixed_quantity.tolist()
+        signals = buy_signal.tolist()
+        # Trades change liquidity and holdings for the next cells, so the cells are walked in order
+        for day, asset in zip(*np.nonzero(valid)):
+            price = prices[day][asset]
+            if signals[day][asset]:
+                if self.strategy == 'FIXED':
+                    qty = int(fixed_quantity[day][asset])
+                else:
+                    qty = self._buy_quantity(returns[day][asset], price, liquidity)
+                if qty > 0:
+                    liquidity -= price * qty
+                    if held[asset] == 0:
+                        avg[asset] = price
+                    else:
+                        total_qty = held[asset] + qty
+                        avg[asset] = ((held[asset] * avg[asset]) + (qty * price)) / total_qty
+                    held[asset] += qty
+                    buy[day, asset] = qty
+                    continue
+            if held[asset] > 0 and self._should_sell(price, avg[asset]):
+                liquidity += price * held[asset]
+                sell[day, asset] = held[asset]
+                held[asset] = 0
+                avg[asset] = 0.0
+
+        return {
+            'buy': buy.reshape(shape),
+            'sell': sell.reshape(shape),
+            'liquidity': liquidity,
+            'quantity': np.array(held, dtype=np.int64),
+            'avg_price': np.array(avg),
+        }
+
+    def _buy_quantities(self, expected_return, current, liquidity, rng):
+        max_liquidity = liquidity * (1 - self.reserve)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if self.strategy == 'PROPORTIONAL':
+                quantity = np.maximum(np.trunc((self.alpha * expected_return) * (max_liquidity // current)), 0)
+            elif self.strategy == 'FIXED_PERCENT':
+                quantity = np.trunc((self.fixed_pct * max_liquidity) // current)
+            elif self.strategy == 'FIXED':
+                quantity = np.trunc(np.broadcast_to(self.fixed // current, np.shape(liquidity)))
+            elif self.strategy == 'RANDOM':
+                random_pct = rng.uniform(0.05, 0.5, np.shape(liquidity))
+                quantity = np.trunc((random_pct * max_liquidity) // current)
+            else:
+                quantity = np.zeros(np.shape(liquidity))
+        return np.where(np.isfinite(quantity), quantity, 0).astype(np.int64)
+
+    def decide_paths(self, predicted, current, liquidity, quantity, avg_price, rng=None):
+        """
+        One asset on one day for many independent portfolios (paths), with the same rules as decide_action.
+        predicted, liquidity, quantity, avg_price: arrays of shape (paths,); current: the asset price, a scalar
+        or one value per path. rng: numpy Generator for the RANDOM strategy (default: np.random).
+        Returns a dict with the 'buy' and 'sell' quantities per path and the new 'liquidity', 'quantity' and
+        'avg_price'.
+        """
+        predicted = np.asarray(predicted, dtype=float)
+        liquidity = np.asarray(liquidity, dtype=float)
+        quantity = np.asarray(quantity, dtype=np.int64)
+        avg_price = np.asarray(avg_price, dtype=float)
+        valid = np.isfinite(predicted) & np.isfinite(current)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            expected_return = (predicted - current) / current
+            current_perf = (current - avg_price) / avg_price
+
+        buy_quantity = self._buy_quantities(expected_return, current, liquidity, rng or np.random)
+        buy = np.where(valid & (expected_return > self.tp_min) & (buy_quantity > 0), buy_quantity, 0)
+        should_sell = (current_perf <= -self.sl_max) | (current_perf >= self.tp_max)
+        sell = np.where(valid & (buy == 0) & (quantity > 0) & should_sell, quantity, 0)
+
+        # A path either buys or sells, so the zero term keeps liquidity equal to the sequential update
+        liquidity = liquidity - current * buy + current * sell
+        total_qty = quantity + buy
+        with np.errstate(divide='ignore', invalid='ignore'):
+            averaged = ((quantity * avg_price) + (buy * current)) / total_qty
+        avg_price = np.where(buy > 0, np.where(quantity == 0, current, averaged), avg_price)
+        avg_price = np.where(sell > 0, 0.0, avg_price)
+        return {
+            'buy': buy,
+            'sell': sell,
+            'liquidity': liquidity,
+            'quantity': np.where(sell > 0, 0, total_qty),
+            'avg_price': avg_price,
+        }
@@ -1 +1,2 @@
-from .engineering_feature_module import FeatureEngineeringModule
\ No newline at end of file
+from .engineering_feature_module import FeatureEngineeringModule
+from .incremental_feature_module import IncrementalFeatureModule
@@ -1,38 +1,85 @@
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler, MinMaxScaler
-from ta.momentum import RSIIndicator
-from ta.trend import MACD
+
+'''
+Config params
+'''
+RSI_WINDOW = 14
+MACD_WINDOW_SLOW = 26
+MACD_WINDOW_FAST = 12
+MACD_WINDOW_SIGN = 9
 
 
 class FeatureEngineeringModule:
     def __init__(self, df):
         self.df = df.copy()
 
+    @staticmethod
+    def _ema(prices, span):
+        return prices.ewm(span=span, min_periods=span, adjust=False).mean()
+
+    @staticmethod
+    def _rsi(prices, window=RSI_WINDOW):
+        """Same computation as ta.momentum.RSIIndicator, for every column at once."""
+        diff = prices.diff(1)
+        up_direction = diff.where(diff > 0, 0.0)
+        down_direction = -diff.where(diff < 0, 0.0)
+        emaup = up_direction.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+        emadn = down_direction.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+        relative_strength = emaup / emadn
+        return pd.DataFrame(
+            np.where(emadn == 0, 100, 100 - (100 / (1 + relative_strength))),
+            index=prices.index,
+            columns=prices.columns
+        )
+
+    def _macd_diff(self, prices):
+        """Same computation as ta.trend.MACD.macd_diff, for every column at once."""
+        macd = self._ema(prices, MACD_WINDOW_FAST) - self._ema(prices, MACD_WINDOW_SLOW)
+        return macd - self._ema(macd, MACD_WINDOW_SIGN)
+
+    def technical_indicators(self, asset_list):
+        """
+        Indicators of every asset computed over the (dates x assets) price matrix in one pass
+        """
+        prices = self.df[[f"{asset}_value" for asset in asset_list]]
+        prices.columns = asset_list
+        indicators = {
+            'ma_5': prices.rolling(window=5).mean(),
+            'ma_10': prices.rolling(window=10).mean(),
+            'volatility_5': prices.rolling(window=5).std(),
+            'rsi': self._rsi(prices),
+            'macd': self._macd_diff(prices),
+        }
+        block = {
+            f"{asset}_feature_{name}": values[asset].to_numpy()
+            for asset in asset_list
+            for name, values in indicators.items()
+        }
+        return pd.DataFrame(block, index=self.df.index)
+
     def apply_technical_indicators(self, asset):
-        price_col = f"{asset}_value"
-        temp_df = pd.DataFrame(index=self.df.index)
-        temp_df[f"{asset}_feature_ma_5"] = self.df[price_col].rolling(window=5).mean()
-        temp_df[f"{asset}_feature_ma_10"] = self.df[price_col].rolling(window=10).mean()
-        temp_df[f"{asset}_feature_volatility_5"] = self.df[price_col].rolling(window=5).std()
-        rsi = RSIIndicator(close=self.df[price_col], window=14)
-        temp_df[f"{asset}_feature_rsi"] = rsi.rsi()
-        macd = MACD(close=self.df[price_col])
-        temp_df[f"{asset}_feature_macd"] = macd.macd_diff()
-        self.df = pd.concat([self.df, temp_df], axis=1)
+        self.apply_to_all_assets([asset])
 
     def apply_to_all_assets(self, asset_list):
-        for asset in asset_list:
-            self.apply_technical_indicators(asset)
+        self.df = pd.concat([self.df, self.technical_indicators(list(asset_list))], axis=1)
 
     def get_featured_data(self):
         return self.df.dropna().reset_index(drop=True)
 
-    def scale_standard(self, exclude_value=True):
-        df = self.df.copy()
+    @staticmethod
+    def scale_columns(df, exclude_value=True):
         exclude = ['timestamp']
         if exclude_value:
             exclude += [col for col in df.columns if col.endswith('_value')]
-        scale_cols = [col for col in df.columns if col not in exclude and pd.api.types.is_numeric_dtype(df[col])]
+        return [col for col in df.columns if col not in exclude and pd.api.types.is_numeric_dtype(df[col])]
+
+    def scale_standard(self, exclude_value=True):
+        # Imported here so importing the feature package does not load scikit-learn
+        from sklearn.preprocessing import StandardScaler
+
+        df = self.df.copy()
+        scale_cols = self.scale_columns(df, exclude_value)
         scaler = StandardScaler()
         df[scale_cols] = scaler.fit_transform(df[scale_cols])
         self.df = df
@@ -40,10 +87,7 @@ class FeatureEngineeringModule:
 
     def scale_minmax(self, scaler, exclude_value=True):
         df = self.df.copy()
-        exclude = ['timestamp']
-        if exclude_value:
-            exclude += [col for col in df.columns if col.endswith('_value')]
-        scale_cols = [col for col in df.columns if col not in exclude and pd.api.types.is_numeric_dtype(df[col])]
+        scale_cols = self.scale_columns(df, exclude_value)
         df[scale_cols] = scaler.fit_transform(df[scale_cols])
         self.df = df
         return self.df
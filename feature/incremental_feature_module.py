@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+from feature.engineering_feature_module import (
+    FeatureEngineeringModule, RSI_WINDOW, MACD_WINDOW_SLOW, MACD_WINDOW_FAST, MACD_WINDOW_SIGN
+)
+
+'''
+Config params
+'''
+PRICE_HISTORY = 10
+
+
+def _alpha(span):
+    return 2 / (span + 1)
+
+
+class IncrementalFeatureModule:
+    """
+    Keeps the state needed to extend apply_to_all_assets + scale_standard one row at a time:
+    - the last PRICE_HISTORY prices of every asset (moving averages and volatility)
+    - the RSI and MACD exponential averages with their observation counts
+    - running count, mean and sum of squared deviations of every scaled column (standard scaler)
+
+    append() returns the featured and scaled row a full recompute over the history plus that row would produce,
+    up to float tolerance. Values missing from the row are taken as 0, as align_all_data does.
+    """
+
+    def __init__(self, df, asset_list, exclude_value=True):
+        """
+        df: aligned data before feature engineering, as returned by DataIngestionModule.align_all_data
+        """
+        self.assets = list(asset_list)
+        self.raw_columns = list(df.columns)
+        feature_module = FeatureEngineeringModule(df)
+        feature_module.apply_to_all_assets(self.assets)
+        featured = feature_module.df
+        self.columns = list(featured.columns)
+        self.scale_cols = FeatureEngineeringModule.scale_columns(featured, exclude_value)
+        self.price_cols = [f"{asset}_value" for asset in self.assets]
+
+        prices = featured[self.price_cols].to_numpy(dtype=float)
+        self.n_obs = len(prices)
+        self.history = prices[-PRICE_HISTORY:].copy()
+        self.last_price = prices[-1].copy()
+
+        # Unmasked exponential averages (min_periods only hides values, it does not change them)
+        prices_df = pd.DataFrame(prices)
+        diff = prices_df.diff(1)
+        self.ema_up = diff.where(diff > 0, 0.0).ewm(alpha=1 / RSI_WINDOW, adjust=False).mean().iloc[-1].to_numpy()
+        self.ema_down = (-diff.where(diff < 0, 0.0)).ewm(alpha=1 / RSI_WINDOW, adjust=False).mean().iloc[-1].to_numpy()
+        ema_fast = prices_df.ewm(span=MACD_WINDOW_FAST, adjust=False).mean()
+        ema_slow = prices_df.ewm(span=MACD_WINDOW_SLOW, adjust=False).mean()
+        macd = (ema_fast - ema_slow).where(prices_df.notna().cumsum() >= MACD_WINDOW_SLOW)
+        self.ema_fast = ema_fast.iloc[-1].to_numpy()
+        self.ema_slow = ema_slow.iloc[-1].to_numpy()
+        self.ema_sign = macd.ewm(span=MACD_WINDOW_SIGN, adjust=False).mean().iloc[-1].to_numpy()
+
+        scaled = featured[self.scale_cols].to_numpy(dtype=float)
+        self.count = np.sum(~np.isnan(scaled), axis=0).astype(float)
+        self.mean = np.nansum(scaled, axis=0) / np.maximum(self.count, 1)
+        self.m2 = np.nansum((scaled - self.mean) ** 2, axis=0)
+
+    def _indicators(self, prices):
+        self.n_obs += 1
+        self.history = np.vstack([self.history, prices])[-PRICE_HISTORY:]
+
+        diff = prices - self.last_price
+        self.last_price = prices
+        # The first diff of the series is NaN, taken as 0 by the up/down split, and starts the averages
+        a = 1 / RSI_WINDOW
+        if self.n_obs == 1:
+            self.ema_up, self.ema_down = np.zeros(len(prices)), np.zeros(len(prices))
+        else:
+            self.ema_up = (1 - a) * self.ema_up + a * np.maximum(diff, 0.0)
+            self.ema_down = (1 - a) * self.ema_down + a * np.maximum(-diff, 0.0)
+
+        if self.n_obs == 1:
+            self.ema_fast, self.ema_slow = prices.copy(), prices.copy()
+        else:
+            self.ema_fast = (1 - _alpha(MACD_WINDOW_FAST)) * self.ema_fast + _alpha(MACD_WINDOW_FAST) * prices
+            self.ema_slow = (1 - _alpha(MACD_WINDOW_SLOW)) * self.ema_slow + _alpha(MACD_WINDOW_SLOW) * prices
+        macd = self.ema_fast - self.ema_slow
+        if self.n_obs == MACD_WINDOW_SLOW:
+            self.ema_sign = macd.copy()
+        elif self.n_obs > MACD_WINDOW_SLOW:
+            a_sign = _alpha(MACD_WINDOW_SIGN)
+            self.ema_sign = (1 - a_sign) * self.ema_sign + a_sign * macd
+
+        nan = np.full(len(prices), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(self.ema_down == 0, 100, 100 - (100 / (1 + self.ema_up / self.ema_down)))
+        return {
+            'ma_5': self.history[-5:].mean(axis=0) if self.n_obs >= 5 else nan,
+            'ma_10': self.history[-10:].mean(axis=0) if self.n_obs >= 10 else nan,
+            'volatility_5': self.history[-5:].std(axis=0, ddof=1) if self.n_obs >= 5 else nan,
+            'rsi': rsi if self.n_obs >= RSI_WINDOW else nan,
+            'macd': macd - self.ema_sign if self.n_obs >= MACD_WINDOW_SLOW + MACD_WINDOW_SIGN - 1 else nan,
+        }
+
+    def _scale(self, values):
+        valid = ~np.isnan(values)
+        self.count[valid] += 1
+        delta = values - self.mean
+        self.mean[valid] += delta[valid] / self.count[valid]
+        self.m2[valid] += delta[valid] * (values - self.mean)[valid]
+
+        # Same near-constant feature rule as StandardScaler
+        eps = np.finfo(float).eps
+        var = self.m2 / np.maximum(self.count, 1)
+        constant = var <= self.count * eps * var + (self.count * self.mean * eps) ** 2
+        scale = np.where(constant, 1.0, np.sqrt(var))
+        return (values - self.mean) / scale
+
+    def append(self, row):
+        """
+        row: mapping with the timestamp and the raw (aligned) columns of the new day.
+        Returns a one-row DataFrame with the columns of the batch pipeline; rows with NaN would be removed by
+        remove_na_rows.
+        """
+        raw = {col: row.get(col, 0.0) for col in self.raw_columns}
+        raw['timestamp'] = pd.Timestamp(row['timestamp'])
+        prices = np.array([raw[col] for col in self.price_cols], dtype=float)
+
+        features = dict(raw)
+        for name, values in self._indicators(prices).items():
+            for i, asset in enumerate(self.assets):
+                features[f"{asset}_feature_{name}"] = values[i]
+
+        scaled = self._scale(np.array([features[col] for col in self.scale_cols], dtype=float))
+        features.update(zip(self.scale_cols, scaled))
+        return pd.DataFrame([features], columns=self.columns)
@@ -1,12 +1,25 @@
+import json
+
 import pandas as pd
 import os
 
+from utils.logging_module import EventLogger
+
+_logger = EventLogger('ingestion')
+
 
 class DataIngestionModule:
+    """
+    cache_path: optional Parquet file where the aligned frame is stored. When it is set, CSV files are only
+    read by align_all_data and only if any source file changed (mtime or size) since the cache was written.
+    """
 
-    def __init__(self, data_dir):
+    def __init__(self, data_dir, cache_path=None, use_logs=True):
         self.data_dir = data_dir
+        self.cache_path = cache_path
+        self.use_logs = use_logs
         self.data = {}
+        self.sources = {}
 
     def load_csv(self, filename, date_col="timestamp"):
         path = os.path.join(self.data_dir, filename)
@@ -14,41 +27,89 @@ class DataIngestionModule:
         df = df.sort_values(by=date_col).reset_index(drop=True)
         return df
 
+    def _register(self, key, filename, renames):
+        self.sources[key] = (filename, renames)
+        if self.cache_path is None:
+            self.data[key] = self.load_csv(filename).rename(columns=renames)
+
     def ingest_asset_data(self, asset_files):
         """
         asset_files: dict with asset_code -> filename
         """
         for asset, filename in asset_files.items():
-            df = self.load_csv(filename)
-            df = df.rename(columns={"value": f"{asset}_value", "volume": f"{asset}_volume"})
-            self.data[asset] = df
+            self._register(asset, filename, {"value": f"{asset}_value", "volume": f"{asset}_volume"})
 
     def ingest_sentiment_data(self, sentiment_files):
         """
         sentiment_files: dict with asset_code -> filename
         """
         for asset, filename in sentiment_files.items():
-            df = self.load_csv(filename)
-            df = df.rename(columns={"sentiment": f"{asset}_sentiment"})
-            self.data[f"{asset}_sentiment"] = df
+            self._register(f"{asset}_sentiment", filename, {"sentiment": f"{asset}_sentiment"})
 
     def ingest_macro_data(self, macro_files):
         """
         macro_files: dict with indicator_name -> filename
         """
         for indicator, filename in macro_files.items():
-            df = self.load_csv(filename)
-            df = df.rename(columns={"value": indicator})
-            self.data[indicator] = df
+            self._register(indicator, filename, {"value": indicator})
+
+    def _manifest(self):
+        manifest = []
+        for key, (filename, renames) in self.sources.items():
+            stat = os.stat(os.path.join(self.data_dir, filename))
+            manifest.append([key, filename, renames, stat.st_mtime_ns, stat.st_size])
+        return manifest
+
+    def _load_cache(self, manifest):
+        manifest_path = f"{self.cache_path}.json"
+        if not os.path.exists(self.cache_path) or not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path) as f:
+            if json.load(f) != manifest:
+                return None
+        return pd.read_parquet(self.cache_path)
+
+    def _store_cache(self, df, manifest):
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        df.to_parquet(self.cache_path, index=False)
+        with open(f"{self.cache_path}.json", "w") as f:
+            json.dump(manifest, f)
 
     def align_all_data(self):
-        all_dfs = list(self.data.values())
-        base = all_dfs[0][["timestamp"]].copy()
+        manifest = None
+        if self.cache_path is not None:
+            manifest = self._manifest()
+            cached = self._load_cache(manifest)
+            if cached is not None:
+                self._log("[ingestion] Loaded aligned data from %s", self.cache_path, event='cache_load',
+                          path=self.cache_path)
+                self.final_df = cached
+                return cached
+            for key, (filename, renames) in self.sources.items():
+                if key not in self.data:
+                    self.data[key] = self.load_csv(filename).rename(columns=renames)
 
-        for df in all_dfs[0:]:
-            base = pd.merge(base, df, on="timestamp", how="outer")
+        # One index-aligned concat instead of a chain of outer merges
+        series = []
+        for key, df in self.data.items():
+            df = df.set_index("timestamp")
+            if df.index.has_duplicates:
+                raise ValueError(f"Duplicated timestamps in {key}")
+            series.append(df)
+        base = pd.concat(series, axis=1, join="outer", sort=True)
+        base.index.name = "timestamp"
 
-        base = base.sort_values("timestamp").reset_index(drop=True)
+        base = base.reset_index()
         base = base.fillna(0)
         self.final_df = base
+        if manifest is not None:
+            self._store_cache(base, manifest)
+            self._log("[ingestion] Stored aligned data in %s", self.cache_path, event='cache_store',
+                      path=self.cache_path)
         return base
+
+    def _log(self, msg, *args, **fields):
+        if self.use_logs:
+            _logger.info(msg, *args, **fields)
@@ -4,7 +4,8 @@ import pandas as pd
 
 from feature import FeatureEngineeringModule
 from ingestion import DataIngestionModule
-from simulation import Simulator
+from simulation import ExperimentRunner, ForecastCache, MonteCarloBaseline, Simulator
+from utils import configure_logging, flush_logging
 
 import warnings
 
@@ -27,7 +28,23 @@ tp_min = 0.01
 tp_max = 0.05
 sl_min = 0.0
 sl_max = 0.05  # If 1.0, it will never sell on losses
-algorithm_type = 'LSTM'
+algorithm_type = 'LSTM'  # Any name in prediction.available_models(); new ones via prediction.register_model
+model_params = {}  # Extra model options, e.g. {'warm_start': True, 'full_retrain_every': 5} for LSTM
+parallel = False  # Forecast all assets of a day concurrently
+executor = 'process'  # 'process' or 'thread'
+n_workers = None  # None uses one worker per CPU (at most one per asset)
+use_forecast_cache = False  # Reuse forecasts stored in files/forecast_cache.parquet
+retrain_every = 1  # Days each trained model serves with a multi-step forecast (1 retrains daily)
+use_checkpoint = False  # Save progress to files/simulation_checkpoint.pkl and resume from it on the next run
+experiments = {}  # name -> Simulator params, e.g. {'arima': {'algorithm_type': 'ARIMA'}}, run in parallel
+monte_carlo_paths = 0  # > 0 also runs that many random-forecast backtests and writes files/monte_carlo.csv
+instrument = False  # Time every simulation stage and write files/simulation_metrics.json
+log_level = 'INFO'  # 'WARNING' keeps the simulation loop quiet
+log_path = None  # e.g. f'{FILES_DIR}/simulation_log.jsonl'
+log_format = 'text'  # 'text', 'jsonl' or 'columnar' (Parquet/CSV table written at exit)
+use_ingestion_cache = False  # Reuse the aligned input stored in files/aligned_data.parquet while inputs are unchanged
+
+configure_logging(level=log_level, path=log_path, fmt=log_format)
 
 '''
 Data ingestion
@@ -85,7 +102,8 @@ assets = historical_asset_files.keys()  # Using all assets
 sentiment_paths = {k: os.path.join(SENTIMENT_DIR, v) for k, v in sentiment_files.items()}
 macro_paths = {k: os.path.join(MACRO_DIR, v) for k, v in macro_files.items()}
 asset_paths = {k: os.path.join(HISTORIC_DIR, v) for k, v in historical_asset_files.items()}
-ingestor = DataIngestionModule(data_dir=BASE_INPUT_DIR)
+ingestion_cache_path = f'{FILES_DIR}/aligned_data.parquet' if use_ingestion_cache else None
+ingestor = DataIngestionModule(data_dir=BASE_INPUT_DIR, cache_path=ingestion_cache_path)
 ingestor.ingest_sentiment_data(sentiment_paths)
 ingestor.ingest_macro_data(macro_paths)
 ingestor.ingest_asset_data(asset_paths)
@@ -104,29 +122,70 @@ df.to_csv(f'{FILES_DIR}/full_dataset.csv', index=False)
 '''
 Part III - Simulation call
 '''
-simulator = Simulator(
-    simulation_list=list(assets),
-    df=df,
-    initial_liquidity=liquidity,
-    algorithm_type=algorithm_type,
-    sl_min=sl_min,
-    sl_max=sl_max,
-    tp_min=tp_min,
-    tp_max=tp_max,
-    reserve=reserve,
-    operate_in_weekends=False,
-    use_logs=True
-)
-
-simulator.run(simulation_date_start, simulation_date_end)
-
-transactions_df = pd.DataFrame(simulator.transactions)
-transactions_df.to_csv(f"{FILES_DIR}/simulation_auto_arima_20180101_20250101", index=False)
-
-final_value = simulator.liquidity
-for asset, data in simulator.portfolio.items():
-    current_price = df[df['timestamp'] == simulation_date_end][f"{asset}_value"].values
-    if len(current_price) > 0:
-        final_value += data['quantity'] * current_price[0]
-
-print(f"Final value: {final_value:,.2f}")
+if experiments:
+    # One shared copy of the dataset for every experiment, see ExperimentRunner
+    runner = ExperimentRunner(
+        df,
+        simulation_list=list(assets),
+        experiments=experiments,
+        n_workers=n_workers,
+        initial_liquidity=liquidity,
+        sl_min=sl_min,
+        sl_max=sl_max,
+        tp_min=tp_min,
+        tp_max=tp_max,
+        reserve=reserve,
+        operate_in_weekends=False,
+        use_logs=True,
+        retrain_every=retrain_every
+    )
+    summary = runner.run(simulation_date_start, simulation_date_end)
+    summary.to_csv(f'{FILES_DIR}/experiments.csv', index=False)
+    # Results are printed at any log level, after every queued log line
+    flush_logging()
+    print(summary)
+else:
+    forecast_cache = ForecastCache(f'{FILES_DIR}/forecast_cache.parquet') if use_forecast_cache else None
+    simulator = Simulator(
+        simulation_list=list(assets),
+        df=df,
+        initial_liquidity=liquidity,
+        algorithm_type=algorithm_type,
+        sl_min=sl_min,
+        sl_max=sl_max,
+        tp_min=tp_min,
+        tp_max=tp_max,
+        reserve=reserve,
+        operate_in_weekends=False,
+        use_logs=True,
+        model_params=model_params,
+        parallel=parallel,
+        executor=executor,
+        n_workers=n_workers,
+        forecast_cache=forecast_cache,
+        retrain_every=retrain_every,
+        checkpoint_path=f'{FILES_DIR}/simulation_checkpoint.pkl' if use_checkpoint else None,
+        instrument=instrument,
+        metrics_path=f'{FILES_DIR}/simulation_metrics.json' if instrument else None
+    )
+
+    simulator.run(simulation_date_start, simulation_date_end, resume=use_checkpoint)
+
+    transactions_df = simulator.transactions.to_frame()
+    transactions_df.to_csv(f"{FILES_DIR}/simulation_auto_arima_20180101_20250101", index=False)
+    simulator.equity_curve().to_csv(f"{FILES_DIR}/equity_curve.csv")
+
+    final_value = simulator.portfolio_value(simulation_date_end)
+
+    # Results are printed at any log level, after every queued log line
+    flush_logging()
+    print(f"Final value: {final_value:,.2f}")
+
+    if monte_carlo_paths > 0:
+        # Null distribution of the same setup under random forecasts, to tell the result apart from chance
+        monte_carlo = MonteCarloBaseline(simulator, n_paths=monte_carlo_paths)
+        monte_carlo.run(simulation_date_start, simulation_date_end)
+        monte_carlo.results.to_csv(f"{FILES_DIR}/monte_carlo.csv", index=False)
+        accuracy = simulator.direction_hits / simulator.direction_total if simulator.direction_total > 0 else None
+        print(monte_carlo.summary())
+        print(monte_carlo.compare(final_value, accuracy))
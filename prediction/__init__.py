@@ -1,4 +1,18 @@
-from .lstm_prediction_module import LSTMForecastModel
-from .random_prediction_module import RandomPredictiveModel
-from .arima_prediction_module import TimeSeriesPredictiveModel
-from .lstm_prediction_module import LSTMForecastModel
+import importlib
+
+from .registry_module import register_model, available_models, get_model_class, startup_profile
+
+# Model classes are resolved on first access so importing the package does not load TensorFlow or pmdarima
+_LAZY_EXPORTS = {
+    'LSTMForecastModel': '.lstm_prediction_module',
+    'RandomPredictiveModel': '.random_prediction_module',
+    'TimeSeriesPredictiveModel': '.arima_prediction_module',
+    'ShiftPredictiveModel': '.shift_supervised_prediction_module',
+    'BatchedARPredictiveModel': '.autoregressive_prediction_module',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
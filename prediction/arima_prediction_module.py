@@ -1,11 +1,35 @@
 from datetime import timedelta
+import numpy as np
 import pandas as pd
 from pmdarima import auto_arima
 
+from utils.logging_module import EventLogger
+
+'''
+Config params
+'''
+ORDER_SEARCH_EVERY = 20
+ERROR_THRESHOLD = 1.5
+ERROR_WINDOW = 10
+REWINDOW_EVERY = 5
+
+_logger = EventLogger('prediction.arima')
+
 
 class TimeSeriesPredictiveModel:
+    """
+    cache_order=False runs the auto_arima order search on every train call.
+    cache_order=True keeps the fitted model per target column and, on later calls, only advances it with the
+    new observations (pmdarima update). The order search is run again every order_search_every calls or when
+    the mean absolute in-sample error of the last ERROR_WINDOW observations grows past error_threshold times
+    the error measured right after the last search. Every rewindow_every updates the cached model is refitted
+    with its order on the last window_size observations, so it keeps matching the windowed fit instead of
+    growing with the whole backtest.
+    """
 
-    def __init__(self, use_logs=True, seasonal=False, max_order=(6, 6, 6), window_size=30):
+    def __init__(self, use_logs=True, seasonal=False, max_order=(6, 6, 6), window_size=30, cache_order=False,
+                 order_search_every=ORDER_SEARCH_EVERY, error_threshold=ERROR_THRESHOLD,
+                 rewindow_every=REWINDOW_EVERY):
         self.use_logs = use_logs
         self.seasonal = seasonal
         self.max_order = max_order
@@ -13,10 +37,25 @@ class TimeSeriesPredictiveModel:
         self.fitted_model = None
         self.last_train_index = None
         self.window_size = window_size
+        self.cache_order = cache_order
+        self.order_search_every = order_search_every
+        self.error_threshold = error_threshold
+        self.rewindow_every = rewindow_every
+        self.order_cache = {}
 
     def train(self, df: pd.DataFrame, target_col: str):
-        ts = df.set_index('timestamp')[target_col].dropna().asfreq('D')
+        ts = pd.Series(df[target_col].to_numpy(), index=pd.DatetimeIndex(df['timestamp']), name=target_col)
+        ts = ts.dropna().asfreq('D')
         self.last_train_index = ts.index[-1]
+
+        state = self.order_cache.get(target_col) if self.cache_order else None
+        if state is not None and self._update_cached(state, ts):
+            self.model = state['model']
+            self._log("[arima] Model updated with cached order: %s", self.model.order, event='update',
+                      date=self.last_train_index, asset=target_col.removesuffix('_value'), order=self.model.order)
+            self._log("[arima] Last training date: %.10s", self.last_train_index)
+            return
+
         self.model = auto_arima(
             ts[-self.window_size:],
             seasonal=self.seasonal,
@@ -29,15 +68,48 @@ class TimeSeriesPredictiveModel:
             suppress_warnings=True,
             error_action='ignore'
         )
-        self._log(f"[arima] Model trained with order: {self.model.order}")
-        self._log(f"[arima] Last training date: {self.last_train_index.date()}")
+        if self.cache_order:
+            self.order_cache[target_col] = {
+                'model': self.model,
+                'last_index': self.last_train_index,
+                'updates': 0,
+                'error': self._recent_error(self.model),
+            }
+        self._log("[arima] Model trained with order: %s", self.model.order, event='train',
+                  date=self.last_train_index, asset=target_col.removesuffix('_value'), order=self.model.order)
+        self._log("[arima] Last training date: %.10s", self.last_train_index)
+
+    def _update_cached(self, state, ts):
+        if state['updates'] + 1 >= self.order_search_every or ts.index[-1] < state['last_index']:
+            return False
+
+        new_obs = ts[ts.index > state['last_index']]
+        state['updates'] += 1
+        if state['updates'] % self.rewindow_every == 0:
+            # Same order, refitted on the window the full search uses
+            state['model'].fit(ts[-self.window_size:])
+        elif len(new_obs) > 0:
+            state['model'].update(new_obs)
+        state['last_index'] = ts.index[-1]
+
+        error = self._recent_error(state['model'])
+        if error > self.error_threshold * state['error']:
+            self._log("[arima] In-sample error degraded (%.4f > %s x %.4f), searching order again", error,
+                      self.error_threshold, state['error'], event='order_search', error=error,
+                      reference_error=state['error'])
+            return False
+        return True
+
+    def _recent_error(self, model):
+        return float(np.nanmean(np.abs(model.resid()[-ERROR_WINDOW:])))
 
     def predict(self, horizon=1):
         forecast = self.model.predict(n_periods=horizon)
         dates = pd.date_range(start=self.last_train_index + timedelta(days=1), periods=horizon)
-        self._log(f"[arima] Prediction from {dates[0].date()} to {dates[-1].date()}")
+        self._log("[arima] Prediction from %.10s to %.10s", dates[0], dates[-1], event='predict', date=dates[0],
+                  horizon=horizon)
         return pd.Series(forecast, index=dates, name='forecast')
 
-    def _log(self, msg):
+    def _log(self, msg, *args, **fields):
         if self.use_logs:
-            print(msg)
\ No newline at end of file
+            _logger.info(msg, *args, **fields)
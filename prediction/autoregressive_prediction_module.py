@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+from utils.logging_module import EventLogger
+
+_logger = EventLogger('prediction.ar')
+
+'''
+Config params
+'''
+LAGS = 5
+
+
+class BatchedARPredictiveModel:
+    """
+    Least-squares autoregressive model of every asset, fitted for all of them at once.
+    train_all() stacks the lag matrices of the assets into one (assets x samples x features) tensor and solves
+    every regression with a single batched solve of the normal equations; the next horizon values of each asset
+    are forecast recursively in the same pass, every forecast being fed back as the newest lag.
+    Features of the value at row t: intercept, value at t-1 ... t-lags and, with exogenous=True, the asset
+    sentiment and the usa_/euro_ macro columns at t-1, held at their last known values for multi-step forecasts.
+    window: number of most recent rows used for fitting (None uses the whole history).
+    train/predict serve the stored forecast of one asset, refitting only when the data changed.
+    """
+
+    batched = True
+
+    def __init__(self, lags=LAGS, exogenous=False, window=None, use_logs=True):
+        if lags < 1:
+            raise ValueError("lags must be at least 1")
+        self.lags = lags
+        self.exogenous = exogenous
+        self.window = window
+        self.use_logs = use_logs
+        self.target_col_suffix = "_value"
+
+        self.assets = []
+        self.coefficients = None
+        self.forecasts = None
+        self.batch_rows = None
+        self.horizon = 1
+
+    def _exogenous(self, df, assets):
+        # (rows x assets x features): own sentiment (zeros if missing) followed by the shared macro columns
+        sentiment = np.stack([
+            df[f"{asset}_sentiment"].to_numpy(dtype=float) if f"{asset}_sentiment" in df.columns
+            else np.zeros(len(df))
+            for asset in assets
+        ], axis=1)[:, :, None]
+        macro_cols = [col for col in df.columns if col.startswith("usa_") or col.startswith("euro_")]
+        macro = df[macro_cols].to_numpy(dtype=float)
+        macro = np.broadcast_to(macro[:, None, :], (len(df), len(assets), len(macro_cols)))
+        return np.concatenate([sentiment, macro], axis=2)
+
+    def train_all(self, df: pd.DataFrame, assets, horizon=1):
+        """
+        Fits the models of assets on df and stores their forecasts for the next horizon rows.
+        """
+        assets = list(assets)
+        batch_rows = len(df)
+        if self.window is not None:
+            df = df.iloc[-(self.window + self.lags):]
+        values = df[[f"{asset}{self.target_col_suffix}" for asset in assets]].to_numpy(dtype=float)
+        n_rows = len(values)
+        if n_rows <= self.lags:
+            raise ValueError(f"Need more than {self.lags} rows to fit the AR model")
+
+        # windows[i] holds rows i .. i + lags - 1 of every asset, reversed so that lag 1 comes first
+        windows = np.lib.stride_tricks.sliding_window_view(values, self.lags, axis=0)[:, :, ::-1]
+        parts = [np.ones((n_rows - self.lags + 1, len(assets), 1)), windows]
+        if self.exogenous:
+            parts.append(self._exogenous(df, assets)[self.lags - 1:])
+        design = np.concatenate(parts, axis=2).transpose(1, 0, 2)
+
+        # The last window has no target yet, it is the input of the first forecast
+        x, latest = design[:, :-1], design[:, -1]
+        y = values[self.lags:].T
+        valid = ~(np.isnan(x).any(axis=2) | np.isnan(y))
+        if not valid.any(axis=1).all() or np.isnan(latest).any():
+            raise ValueError("No valid data to fit the AR model")
+        x = np.where(valid[:, :, None], x, 0.0)
+        y = np.where(valid, y, 0.0)
+
+        # Normal equations of all assets in one batched solve; columns are scaled to keep the Gram matrices
+        # well conditioned and the pseudo-inverse copes with constant or collinear features
+        scale = np.abs(x).max(axis=1, keepdims=True)
+        scale[scale == 0] = 1.0
+        x = x / scale
+        gram = x.transpose(0, 2, 1) @ x
+        moments = x.transpose(0, 2, 1) @ y[:, :, None]
+        self.coefficients = (np.linalg.pinv(gram, hermitian=True) @ moments)[:, :, 0] / scale[:, 0]
+        self.forecasts = self._roll_forward(latest, horizon)
+        self.assets = assets
+        self.batch_rows = batch_rows
+        self.horizon = horizon
+        self._log("[AR] Fitted %d assets with %d features on up to %d samples", len(assets), design.shape[2],
+                  x.shape[1], event='train', assets=len(assets), features=design.shape[2], samples=x.shape[1])
+
+    def _roll_forward(self, latest, horizon):
+        # latest: (assets x features) input row of the first forecast; returns (horizon x assets)
+        x = latest.copy()
+        preds = []
+        for _ in range(horizon):
+            pred = np.einsum('af,af->a', x, self.coefficients)
+            preds.append(pred)
+            x[:, 2:self.lags + 1] = x[:, 1:self.lags]
+            x[:, 1] = pred
+        return np.array(preds)
+
+    def predict_all(self, horizon=1):
+        """
+        Forecast of every fitted asset: a Series indexed by asset, or a (horizon x assets) DataFrame when
+        horizon > 1.
+        """
+        if self.forecasts is None:
+            raise ValueError("AR model is not fitted")
+        if horizon > self.horizon:
+            raise ValueError(f"Model trained for {self.horizon} steps, cannot forecast {horizon}")
+        if horizon == 1:
+            return pd.Series(self.forecasts[0], index=self.assets, name='forecast')
+        return pd.DataFrame(self.forecasts[:horizon], columns=self.assets)
+
+    def fit_predict(self, df: pd.DataFrame, assets, horizon=1):
+        self.train_all(df, assets, horizon)
+        return self.predict_all(horizon)
+
+    def train(self, asset, df: pd.DataFrame, horizon=1):
+        if self.batch_rows != len(df) or asset not in self.assets or self.horizon < horizon:
+            self.train_all(df, [asset], horizon)
+
+    def predict(self, asset, horizon=1):
+        """
+        Returns the next value, or an array with the next horizon values when horizon > 1.
+        """
+        if asset not in self.assets:
+            raise ValueError(f"AR model not fitted for {asset}")
+        if horizon > self.horizon:
+            raise ValueError(f"Model trained for {self.horizon} steps, cannot forecast {horizon}")
+        forecast = self.forecasts[:horizon, self.assets.index(asset)]
+        self._log("[AR] Predict %s: %.4f", asset, forecast[0], event='predict', asset=asset, predicted=forecast[0])
+        if horizon == 1:
+            return forecast[0]
+        return forecast
+
+    def _log(self, msg, *args, **fields):
+        if self.use_logs:
+            _logger.info(msg, *args, **fields)
@@ -1,38 +1,69 @@
 import numpy as np
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler
-from keras import Sequential, Input
+from keras import Sequential, Input, Model
 from keras.layers import LSTM, Dense, Dropout
 
+from prediction.sliding_window_module import SlidingWindowDataset
+from utils.logging_module import EventLogger
+
 '''
 Config params
 '''
 EPOCH = 6
 BATCH_SIZE = 16
 LOOKBACK_DAYS = 30
+FINE_TUNE_EPOCH = 2
+FULL_RETRAIN_EVERY = 5
+
+_logger = EventLogger('prediction.lstm')
+
 
 class LSTMForecastModel:
-    def __init__(self, lookback=LOOKBACK_DAYS, loss_function='mse', use_logs=True):
+    """
+    warm_start=False rebuilds and trains a new network on every train call.
+    warm_start=True keeps one network (and its scaler) per target column: it is trained from scratch
+    every full_retrain_every calls and, in between, only fine-tuned on the windows that became
+    available since the previous call. The scaled rows of each target are kept in a SlidingWindowDataset,
+    so fine-tuning only scales and appends the new rows.
+    batched=True trains the networks of several targets as independent towers of one Keras model: train_all()
+    runs a single fit and a single predict for all of them, and train/predict then serve the stored forecast of
+    each target for the same data.
+    Training with horizon > 1 gives the network one output per step ahead (direct multi-step forecast).
+    """
+
+    def __init__(self, lookback=LOOKBACK_DAYS, loss_function='mse', use_logs=True, warm_start=False,
+                 full_retrain_every=FULL_RETRAIN_EVERY, fine_tune_epochs=FINE_TUNE_EPOCH, dtype=np.float32,
+                 batched=False):
+        if batched and warm_start:
+            raise ValueError("batched and warm_start cannot be combined")
         self.lookback = lookback
         self.loss_function = loss_function
         self.use_logs = use_logs
+        self.dtype = dtype
+        self.warm_start = warm_start
+        self.batched = batched
+        self.full_retrain_every = full_retrain_every
+        self.fine_tune_epochs = fine_tune_epochs
 
         self.model = None
         self.scaler = None
         self.feature_cols = None
         self.target_col = None
+        self.windows = None
+        self.asset_states = {}
+        self.batch_forecasts = {}
+        self.batch_rows = None
+        self.horizon = 1
 
-    def _prepare_xy(self, df: pd.DataFrame):
-        data = df[self.feature_cols + [self.target_col]].values
-        scaled_data = self.scaler.fit_transform(data)
-
-        target_index = len(self.feature_cols)
+    def _select(self, df: pd.DataFrame):
+        return df[self.feature_cols + [self.target_col]].dropna(subset=self.feature_cols)
 
-        X, y = [], []
-        for i in range(len(scaled_data) - self.lookback - 1):
-            X.append(scaled_data[i:i + self.lookback, :len(self.feature_cols)])
-            y.append(scaled_data[i + self.lookback, target_index])
-        return np.array(X), np.array(y)
+    def _prepare_xy(self, df: pd.DataFrame):
+        data = df.values
+        self.windows = SlidingWindowDataset(self.lookback, dtype=self.dtype)
+        self.windows.extend(self.scaler.fit_transform(data))
+        return self.windows.xy(horizon=self.horizon)
 
     def _build_model(self, input_shape):
         model = Sequential()
@@ -40,35 +71,147 @@ class LSTMForecastModel:
         model.add(LSTM(64))
         model.add(Dropout(0.2))
         model.add(Dense(32, activation='relu'))
-        model.add(Dense(1))
+        model.add(Dense(self.horizon))
         model.compile(optimizer='adam', loss=self.loss_function)
         return model
 
-    def train(self, df: pd.DataFrame, feature_cols: list, target_col: str):
-        df = df.copy().dropna(subset=feature_cols)
+    def _build_batched_model(self, input_shapes):
+        inputs, outputs = [], []
+        for input_shape in input_shapes:
+            x_input = Input(shape=input_shape)
+            x = LSTM(64)(x_input)
+            x = Dropout(0.2)(x)
+            x = Dense(32, activation='relu')(x)
+            inputs.append(x_input)
+            outputs.append(Dense(self.horizon)(x))
+        model = Model(inputs=inputs, outputs=outputs)
+        model.compile(optimizer='adam', loss=[self.loss_function] * len(outputs))
+        return model
+
+    def train_all(self, df: pd.DataFrame, targets: dict, horizon=1):
+        """
+        targets: dict target_col -> feature_cols
+        Trains one tower per target in a single fit and stores the next horizon values forecast for each target.
+        """
+        self.horizon = horizon
+        data, windows, scalers = [], [], []
+        for target_col, feature_cols in targets.items():
+            self.feature_cols, self.target_col = feature_cols, target_col
+            selected = self._select(df)
+            scaler = MinMaxScaler()
+            dataset = SlidingWindowDataset(self.lookback, dtype=self.dtype)
+            dataset.extend(scaler.fit_transform(selected.values))
+            data.append(selected)
+            windows.append(dataset.xy(horizon=horizon))
+            scalers.append(scaler)
+
+        # Towers share the batches, so every target trains on its most recent common number of windows
+        n_windows = min(len(X) for X, _ in windows)
+        X_all = [X[len(X) - n_windows:] for X, _ in windows]
+        y_all = [y[len(y) - n_windows:] for _, y in windows]
+        model = self._build_batched_model([(X.shape[1], X.shape[2]) for X in X_all])
+        self._log("[LSTM] Batched training of %d targets on %d windows", len(targets), n_windows,
+                  event='batched_train', targets=len(targets), windows=n_windows)
+        model.fit(X_all, y_all, epochs=EPOCH, batch_size=BATCH_SIZE, verbose=0)
+
+        x_inputs = [
+            self._scaled_input(selected.dropna(), feature_cols, scaler)
+            for selected, feature_cols, scaler in zip(data, targets.values(), scalers)
+        ]
+        predictions = model.predict(x_inputs, verbose=0)
+        if len(targets) == 1:
+            predictions = [predictions]
+        self.batch_forecasts = {
+            target_col: self._inverse(np.ravel(prediction), len(feature_cols), scaler)
+            for (target_col, feature_cols), prediction, scaler in zip(targets.items(), predictions, scalers)
+        }
+        self.batch_rows = len(df)
+        self.model = model
+        self._log("[LSTM] Batched training complete.", event='batched_train_done')
+
+    def _needs_full_retrain(self, state, df: pd.DataFrame):
+        if state is None or state['feature_cols'] != self.feature_cols or state['horizon'] != self.horizon:
+            return True
+        if state['fine_tunes'] + 1 >= self.full_retrain_every:
+            return True
+        return len(df) < state['windows'].n_rows
+
+    def train(self, df: pd.DataFrame, feature_cols: list, target_col: str, horizon=1):
+        if self.batched:
+            if self.batch_rows != len(df) or target_col not in self.batch_forecasts or self.horizon != horizon:
+                self.train_all(df, {target_col: feature_cols}, horizon)
+            self.feature_cols = feature_cols
+            self.target_col = target_col
+            return
+
         self.feature_cols = feature_cols
         self.target_col = target_col
-        self.scaler = MinMaxScaler()
-        X, y = self._prepare_xy(df)
-        self.model = self._build_model((X.shape[1], X.shape[2]))
-        self._log(f"[LSTM] Training on {X.shape[0]}")
-        self.model.fit(X, y, epochs=EPOCH, batch_size=BATCH_SIZE, verbose=0)
-        self._log("[LSTM] Training complete.")
-
-    def predict(self, df: pd.DataFrame):
-        df = df.copy().dropna(subset=self.feature_cols + [self.target_col])
-        recent = df.tail(self.lookback)[self.feature_cols].values
-        scaled_input = self.scaler.transform(np.hstack([recent, np.zeros((self.lookback, 1))]))
-        x_input = scaled_input[:, :len(self.feature_cols)].reshape(1, self.lookback, len(self.feature_cols))
-
-        y_pred_scaled = self.model.predict(x_input, verbose=0)[0][0]
-
-        dummy_row = np.zeros(len(self.feature_cols) + 1)
-        dummy_row[-1] = y_pred_scaled
-        inv_value = self.scaler.inverse_transform([dummy_row])[0][-1]
-        self._log(f"[LSTM] Predicted next value: {inv_value:.4f}")
-        return inv_value
-
-    def _log(self, text):
+        self.horizon = horizon
+        df = self._select(df)
+        state = self.asset_states.get(target_col) if self.warm_start else None
+
+        if self._needs_full_retrain(state, df):
+            self.scaler = MinMaxScaler()
+            X, y = self._prepare_xy(df)
+            self.model = self._build_model((X.shape[1], X.shape[2]))
+            self._log("[LSTM] Training on %d", X.shape[0], event='train', asset=target_col.removesuffix('_value'),
+                      windows=X.shape[0])
+            self.model.fit(X, y, epochs=EPOCH, batch_size=BATCH_SIZE, verbose=0)
+            state = {'model': self.model, 'scaler': self.scaler, 'windows': self.windows,
+                     'feature_cols': list(feature_cols), 'horizon': horizon, 'n_windows': len(X), 'fine_tunes': 0}
+        else:
+            self.model = state['model']
+            self.scaler = state['scaler']
+            self.windows = state['windows']
+            new_rows = df.values[self.windows.n_rows:]
+            if len(new_rows) > 0:
+                self.windows.extend(self.scaler.transform(new_rows))
+            X, y = self.windows.xy(start=state['n_windows'], horizon=horizon)
+            if len(X) > 0:
+                self._log("[LSTM] Fine-tuning on %d new windows", X.shape[0], event='fine_tune',
+                          asset=target_col.removesuffix('_value'), windows=X.shape[0])
+                self.model.fit(X, y, epochs=self.fine_tune_epochs, batch_size=BATCH_SIZE, verbose=0)
+            state['n_windows'] += len(X)
+            state['fine_tunes'] += 1
+
+        if self.warm_start:
+            self.asset_states[target_col] = state
+        self._log("[LSTM] Training complete.", event='train_done', asset=target_col.removesuffix('_value'))
+
+    def _scaled_input(self, df: pd.DataFrame, feature_cols, scaler):
+        recent = df.tail(self.lookback)[feature_cols].values
+        scaled_input = scaler.transform(np.hstack([recent, np.zeros((self.lookback, 1))]))
+        x_input = scaled_input[:, :len(feature_cols)].reshape(1, self.lookback, len(feature_cols))
+        return x_input.astype(self.dtype)
+
+    def _inverse(self, y_pred_scaled, n_features, scaler):
+        y_pred_scaled = np.atleast_1d(y_pred_scaled)
+        dummy_rows = np.zeros((len(y_pred_scaled), n_features + 1))
+        dummy_rows[:, -1] = y_pred_scaled
+        return scaler.inverse_transform(dummy_rows)[:, -1]
+
+    def predict(self, df: pd.DataFrame, horizon=1):
+        """
+        Returns the next value, or an array with the next horizon values when horizon > 1.
+        horizon cannot exceed the one used for training.
+        """
+        if horizon > self.horizon:
+            raise ValueError(f"Model trained for {self.horizon} steps, cannot forecast {horizon}")
+
+        if self.batched:
+            inv_values = self.batch_forecasts[self.target_col]
+        else:
+            df = df[self.feature_cols + [self.target_col]].dropna()
+            x_input = self._scaled_input(df, self.feature_cols, self.scaler)
+            y_pred_scaled = self.model.predict(x_input, verbose=0)[0]
+            inv_values = self._inverse(y_pred_scaled, len(self.feature_cols), self.scaler)
+
+        self._log("[LSTM] Predicted next value: %.4f", inv_values[0], event='predict',
+                  asset=self.target_col.removesuffix('_value'), predicted=inv_values[0])
+        if horizon == 1:
+            return inv_values[0]
+        return inv_values[:horizon]
+
+    def _log(self, msg, *args, **fields):
         if self.use_logs:
-            print(text)
+            _logger.info(msg, *args, **fields)
@@ -1,30 +1,53 @@
+import zlib
+
 import pandas as pd
 import numpy as np
 from datetime import timedelta
 
+from utils.logging_module import EventLogger
+
+_logger = EventLogger('prediction.random')
+
 
 class RandomPredictiveModel:
+    """
+    Draws come from one generator per target column, seeded from seed and the column name, so a seeded run
+    gives the same forecasts whether one model serves every asset or each asset has its own model (possibly in
+    another thread or process). The global numpy and random states are never touched.
+    """
+
     def __init__(self, use_logs=True, volatility=0.02, seed=None):
         self.use_logs = use_logs
         self.volatility = volatility
+        self.seed = seed
         self.last_train_index = None
         self.current_price = None
-        if seed is not None:
-            np.random.seed(seed)
+        self.target_col = None
+        self.generators = {}
+
+    def _generator(self, target_col):
+        if target_col not in self.generators:
+            # crc32 rather than hash(), which is salted per process
+            entropy = None if self.seed is None else [self.seed, zlib.crc32(target_col.encode())]
+            self.generators[target_col] = np.random.default_rng(entropy)
+        return self.generators[target_col]
 
     def train(self, df: pd.DataFrame, target_col: str):
         ts = df.set_index('timestamp')[target_col].dropna().asfreq('D')
         self.last_train_index = ts.index[-1]
+        self.target_col = target_col
         self.current_price = ts.iloc[-1]
-        self._log(f"[random] Using price {self.current_price:.2f} from {self.last_train_index.date()} as base")
+        self._log("[random] Using price %.2f from %.10s as base", self.current_price, self.last_train_index,
+                  event='train', date=self.last_train_index, asset=target_col.removesuffix('_value'))
 
     def predict(self, horizon=1):
-        returns = np.random.normal(loc=0, scale=self.volatility, size=horizon)
+        returns = self._generator(self.target_col).normal(loc=0, scale=self.volatility, size=horizon)
         forecast = [self.current_price * (1 + r) for r in returns]
         dates = pd.date_range(start=self.last_train_index + timedelta(days=1), periods=horizon)
-        self._log(f"[random] Prediction from {dates[0].date()} to {dates[-1].date()}")
+        self._log("[random] Prediction from %.10s to %.10s", dates[0], dates[-1], event='predict', date=dates[0],
+                  asset=self.target_col.removesuffix('_value'), horizon=horizon)
         return pd.Series(forecast, index=dates, name='forecast')
 
-    def _log(self, msg):
+    def _log(self, msg, *args, **fields):
         if self.use_logs:
-            print(msg)
+            _logger.info(msg, *args, **fields)
@@ -0,0 +1,49 @@
+import numpy as np
+
+
+class RecursiveLeastSquares:
+    """
+    Linear model with intercept updated one sample at a time.
+    forgetting=1.0 weights all samples equally (ordinary least squares); values below 1.0 discount a sample
+    by forgetting**age. fit() solves the weighted problem from scratch and resets the inverse covariance.
+    Features are standardized with the statistics of the last fit to keep the recursion well conditioned.
+    """
+
+    def __init__(self, forgetting=1.0):
+        if not 0.0 < forgetting <= 1.0:
+            raise ValueError("forgetting must be in (0, 1]")
+        self.forgetting = forgetting
+        self.coef = None
+        self.P = None
+        self.mean = None
+        self.scale = None
+        self.n_updates = 0
+
+    def _transform(self, X):
+        X = (np.atleast_2d(np.asarray(X, dtype=float)) - self.mean) / self.scale
+        return np.hstack([X, np.ones((X.shape[0], 1))])
+
+    def fit(self, X, y):
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.mean = X.mean(axis=0)
+        scale = X.std(axis=0)
+        self.scale = np.where(scale > 0, scale, 1.0)
+
+        weights = np.sqrt(self.forgetting ** np.arange(len(y) - 1, -1, -1))
+        Xw = self._transform(X) * weights[:, None]
+        self.coef = np.linalg.lstsq(Xw, y * weights, rcond=None)[0]
+        self.P = np.linalg.pinv(Xw.T @ Xw)
+        self.n_updates = 0
+        return self
+
+    def update(self, x, y):
+        x = self._transform(x)[0]
+        Px = self.P @ x
+        gain = Px / (self.forgetting + x @ Px)
+        self.coef = self.coef + gain * (y - x @ self.coef)
+        self.P = (self.P - np.outer(gain, Px)) / self.forgetting
+        self.n_updates += 1
+
+    def predict(self, X):
+        return self._transform(X) @ self.coef
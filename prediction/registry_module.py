@@ -0,0 +1,63 @@
+import importlib
+import json
+import subprocess
+import sys
+
+'''
+Built-in models as "module:class" paths, imported only when their algorithm type is used
+'''
+MODEL_REGISTRY = {
+    'ARIMA': 'prediction.arima_prediction_module:TimeSeriesPredictiveModel',
+    'RANDOM': 'prediction.random_prediction_module:RandomPredictiveModel',
+    'SHIFT': 'prediction.shift_supervised_prediction_module:ShiftPredictiveModel',
+    'LSTM': 'prediction.lstm_prediction_module:LSTMForecastModel',
+    'AR': 'prediction.autoregressive_prediction_module:BatchedARPredictiveModel',
+}
+
+
+def register_model(algorithm_type, model):
+    """
+    model: a class (or any callable returning a model) or a lazy "module:attribute" path.
+    Models registered under new names follow the ARIMA/RANDOM interface: train(df, target_col) and
+    predict(horizon) returning a Series with one value per step.
+    """
+    MODEL_REGISTRY[algorithm_type] = model
+
+
+def available_models():
+    return list(MODEL_REGISTRY.keys())
+
+
+def get_model_class(algorithm_type):
+    model = MODEL_REGISTRY.get(algorithm_type)
+    if model is None:
+        raise NotImplementedError(f"Modelo no implementado: {algorithm_type}")
+    if isinstance(model, str):
+        module_name, attribute = model.split(':')
+        model = getattr(importlib.import_module(module_name), attribute)
+        MODEL_REGISTRY[algorithm_type] = model
+    return model
+
+
+_STARTUP_PROBE = '''
+import json, resource, sys, time
+start = time.perf_counter()
+import simulation
+from simulation.forecast_module import build_model
+build_model(sys.argv[1], json.loads(sys.argv[2]))
+seconds = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"seconds": seconds, "max_rss_mb": rss / (1024 * 1024 if sys.platform == "darwin" else 1024)}))
+'''
+
+
+def startup_profile(algorithm_type, model_params=None, cwd=None):
+    """
+    Imports the simulation package and builds one model of algorithm_type in a fresh interpreter.
+    Returns the wall time in seconds and the peak resident memory in MB of that process (Unix only).
+    """
+    result = subprocess.run(
+        [sys.executable, '-c', _STARTUP_PROBE, algorithm_type, json.dumps(model_params or {})],
+        capture_output=True, text=True, check=True, cwd=cwd
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
@@ -1,8 +1,29 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
 from sklearn.linear_model import LinearRegression
 
+from prediction.recursive_least_squares_module import RecursiveLeastSquares
+from utils.logging_module import EventLogger
+
+_logger = EventLogger('prediction.shift')
+
 
 class ShiftPredictiveModel:
-    def __init__(self, shift=1, use_logs=True, base_model_cls=LinearRegression):
+    """
+    online=False refits base_model_cls from scratch on every train call.
+    online=True (LinearRegression only) keeps a RecursiveLeastSquares model and a buffer with the last target
+    values per asset: each train call only adds the samples that became complete since the previous call and,
+    after refit_every online updates, the coefficients are refitted on the full history to avoid numerical drift.
+    predict(horizon > 1) is recursive (shift=1 only): every forecast is fed back as the newest lag while the
+    static features keep their last known values.
+    """
+
+    def __init__(self, shift=1, use_logs=True, base_model_cls=LinearRegression, online=False, forgetting=1.0,
+                 refit_every=20):
+        if online and base_model_cls is not LinearRegression:
+            raise ValueError("Online mode is only available for LinearRegression")
         self.shift = shift
         self.use_logs = use_logs
         self.window = None
@@ -10,15 +31,13 @@ class ShiftPredictiveModel:
         self.feature_cols = {}
         self.base_model_cls = base_model_cls
         self.target_col_suffix = "_value"
+        self.online = online
+        self.forgetting = forgetting
+        self.refit_every = refit_every
+        self.online_states = {}
 
-    def train(self, asset, df, window=30):
-        self.window = window
-        target_col = f"{asset}{self.target_col_suffix}"
-        df = df.copy()
-
-        df[f"{asset}_target"] = df[target_col].shift(-self.shift)
-
-        static_features = [
+    def _static_features(self, asset, df):
+        return [
             col for col in df.columns
             if (
                 col.startswith(f"{asset}_feature_")
@@ -29,39 +48,146 @@ class ShiftPredictiveModel:
             )
         ]
 
-        for lag in range(1, window + 1):
-            df[f"{target_col}_lag_{lag}"] = df[target_col].shift(lag)
-            static_features.append(f"{target_col}_lag_{lag}")
+    def _design(self, asset, df, window):
+        target_col = f"{asset}{self.target_col_suffix}"
+        static_features = self._static_features(asset, df)
+        lags = {f"{target_col}_lag_{lag}": df[target_col].shift(lag) for lag in range(1, window + 1)}
+        design = pd.concat(
+            [df[static_features], pd.DataFrame(lags, index=df.index),
+             df[target_col].shift(-self.shift).rename(f"{asset}_target")],
+            axis=1
+        )
+        return design, static_features + list(lags)
+
+    def train(self, asset, df, window=30):
+        self.window = window
+        if self.online:
+            self._train_online(asset, df, window)
+            return
 
-        df = df.dropna(subset=static_features + [f"{asset}_target"])
+        df, features = self._design(asset, df, window)
+        df = df.dropna(subset=features + [f"{asset}_target"])
 
-        self.feature_cols[asset] = static_features
-        x_train = df[static_features]
+        self.feature_cols[asset] = features
+        x_train = df[features]
         y_train = df[f"{asset}_target"]
 
         model = self.base_model_cls()
         model.fit(x_train, y_train)
         self.models[asset] = model
 
-        self._log(f"[Shift] Trained {asset} with {len(x_train)} samples and {len(static_features)} features")
+        self._log("[Shift] Trained %s with %d samples and %d features", asset, len(x_train), len(features),
+                  event='train', asset=asset, samples=len(x_train), features=len(features))
 
-    def predict(self, asset, df):
-        df = df.copy()
+    def _train_online(self, asset, df, window):
+        state = self.online_states.get(asset)
+        static_features = self._static_features(asset, df)
+        if (state is None or state['static_features'] != static_features or state['window'] != window
+                or len(df) < state['n_rows'] or state['model'].n_updates >= self.refit_every):
+            self._refit_online(asset, df, window)
+            return
+
+        target_col = f"{asset}{self.target_col_suffix}"
+        # Only the new rows plus the shift rows whose static features they complete are converted
+        start = max(state['n_rows'] - self.shift, 0)
+        recent_rows = df.iloc[start:]
+        values = recent_rows[target_col].to_numpy(dtype=float)
+        static = recent_rows[static_features].to_numpy(dtype=float)
+        lag_buffer = state['lag_buffer']
+        new_samples = 0
+        for row in range(state['n_rows'], len(df)):
+            lag_buffer.append(values[row - start])
+            # The sample completed by this row has its target here and its features shift rows earlier
+            sample = row - self.shift
+            if sample < window:
+                continue
+            recent = np.array(lag_buffer)
+            lags = recent[-2 - self.shift::-1][:window]
+            x = np.concatenate([static[sample - start], lags])
+            if np.isnan(x).any() or np.isnan(values[row - start]):
+                continue
+            state['model'].update(x, values[row - start])
+            new_samples += 1
+        state['n_rows'] = len(df)
+        self._log("[Shift] Updated %s online with %d new samples", asset, new_samples, event='online_update',
+                  asset=asset, samples=new_samples)
+
+    def _refit_online(self, asset, df, window):
         target_col = f"{asset}{self.target_col_suffix}"
-        for lag in range(1, self.window + 1):
-            lag_col = f"{target_col}_lag_{lag}"
-            if lag_col not in df.columns:
-                df[lag_col] = df[target_col].shift(lag)
+        design, features = self._design(asset, df, window)
+        design = design.dropna(subset=features + [f"{asset}_target"])
+
+        model = RecursiveLeastSquares(forgetting=self.forgetting)
+        model.fit(design[features].to_numpy(dtype=float), design[f"{asset}_target"].to_numpy(dtype=float))
+        self.feature_cols[asset] = features
+        self.online_states[asset] = {
+            'model': model,
+            'static_features': self._static_features(asset, df),
+            'window': window,
+            'n_rows': len(df),
+            'lag_buffer': deque(df[target_col].to_numpy(dtype=float)[-(window + self.shift + 1):],
+                                maxlen=window + self.shift + 1),
+        }
+        self._log("[Shift] Refitted %s online model with %d samples and %d features", asset, len(design), len(features),
+                  event='online_refit', asset=asset, samples=len(design), features=len(features))
 
-        df = df.dropna(subset=self.feature_cols[asset])
-        if df.empty:
+    def predict(self, asset, df, horizon=1):
+        """
+        Returns the next value, or an array with the next horizon values when horizon > 1.
+        """
+        if horizon > 1 and self.shift != 1:
+            raise ValueError("Multi-step forecasts are only available for shift=1")
+        if self.online:
+            return self._predict_online(asset, df, horizon)
+
+        target_col = f"{asset}{self.target_col_suffix}"
+        design, _ = self._design(asset, df, self.window)
+        design = design.dropna(subset=self.feature_cols[asset])
+        if design.empty:
             raise ValueError(f"No valid data to predict {asset}")
 
-        latest_features = df[self.feature_cols[asset]].iloc[-1:]
+        latest_features = design[self.feature_cols[asset]].iloc[-1:]
         pred = self.models[asset].predict(latest_features)[0]
-        self._log(f"[Shift] Predict {asset}: {pred:.4f}")
-        return pred
+        self._log("[Shift] Predict %s: %.4f", asset, pred, event='predict', asset=asset, predicted=pred)
+        if horizon == 1:
+            return pred
+
+        x = latest_features.to_numpy(dtype=float)[0]
+        current = df.loc[latest_features.index[0], target_col]
+        predict_row = lambda row: self.models[asset].predict(
+            pd.DataFrame([row], columns=self.feature_cols[asset]))[0]
+        return self._roll_forward(predict_row, x, current, pred, horizon)
+
+    def _predict_online(self, asset, df, horizon):
+        state = self.online_states[asset]
+        recent = np.array(state['lag_buffer'])
+        if len(df) != state['n_rows'] or len(recent) < self.window + 1:
+            raise ValueError(f"No valid data to predict {asset}")
+
+        static = df.iloc[-1:][state['static_features']].to_numpy(dtype=float)[0]
+        x = np.concatenate([static, recent[-2::-1][:self.window]])
+        if np.isnan(x).any():
+            raise ValueError(f"No valid data to predict {asset}")
+
+        pred = state['model'].predict(x)[0]
+        self._log("[Shift] Predict %s: %.4f", asset, pred, event='predict', asset=asset, predicted=pred)
+        if horizon == 1:
+            return pred
+        return self._roll_forward(lambda row: state['model'].predict(row)[0], x, recent[-1], pred, horizon)
+
+    def _roll_forward(self, predict_row, x, current, pred, horizon):
+        # x holds the static features followed by lag_1..lag_window of the row the first forecast was made from
+        if np.isnan(current):
+            raise ValueError("No valid data for a multi-step forecast")
+        n_static = len(x) - self.window
+        x = x.copy()
+        preds = [pred]
+        for _ in range(horizon - 1):
+            x[n_static:] = np.concatenate([[current], x[n_static:-1]])
+            current = preds[-1]
+            preds.append(predict_row(x))
+        return np.array(preds)
 
-    def _log(self, msg):
+    def _log(self, msg, *args, **fields):
         if self.use_logs:
-            print(msg)
+            _logger.info(msg, *args, **fields)
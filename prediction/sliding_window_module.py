@@ -0,0 +1,54 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class SlidingWindowDataset:
+    """
+    Growable buffer of scaled rows exposed as (X, y) lookback windows without materializing them.
+    The last column of every row is the target, the rest are features. X[i] is a strided view over
+    rows [i, i + lookback) and y[i] is the target of row i + lookback (of rows i + lookback to
+    i + lookback + horizon - 1 when horizon > 1).
+    """
+
+    def __init__(self, lookback, dtype=np.float32, initial_capacity=256):
+        self.lookback = lookback
+        self.dtype = np.dtype(dtype)
+        self.initial_capacity = initial_capacity
+        self.n_rows = 0
+        self._buffer = None
+
+    def extend(self, rows):
+        rows = np.asarray(rows, dtype=self.dtype)
+        if rows.ndim != 2 or len(rows) == 0:
+            return
+        if self._buffer is None:
+            self._buffer = np.empty((max(self.initial_capacity, len(rows)), rows.shape[1]), dtype=self.dtype)
+        elif self._buffer.shape[1] != rows.shape[1]:
+            raise ValueError(f"Expected {self._buffer.shape[1]} columns, got {rows.shape[1]}")
+
+        required = self.n_rows + len(rows)
+        if required > len(self._buffer):
+            grown = np.empty((max(required, 2 * len(self._buffer)), self._buffer.shape[1]), dtype=self.dtype)
+            grown[:self.n_rows] = self._buffer[:self.n_rows]
+            self._buffer = grown
+        self._buffer[self.n_rows:required] = rows
+        self.n_rows = required
+
+    def window_count(self, horizon=1):
+        # For horizon 1, same count as the original loop: range(n_rows - lookback - 1)
+        return max(self.n_rows - self.lookback - horizon, 0)
+
+    def xy(self, start=0, horizon=1):
+        n_windows = self.window_count(horizon)
+        n_features = 0 if self._buffer is None else self._buffer.shape[1] - 1
+        if n_windows <= start:
+            y_shape = (0,) if horizon == 1 else (0, horizon)
+            return (np.empty((0, self.lookback, n_features), dtype=self.dtype),
+                    np.empty(y_shape, dtype=self.dtype))
+
+        data = self._buffer[:self.n_rows]
+        X = sliding_window_view(data[:, :-1], self.lookback, axis=0).transpose(0, 2, 1)
+        y = data[self.lookback:, -1]
+        if horizon > 1:
+            y = sliding_window_view(y, horizon)
+        return X[start:n_windows], y[start:n_windows]
@@ -1 +1,10 @@
 from .simulation_module import Simulator
+from .walk_forward_module import WalkForwardStore
+from .parallel_module import AssetExecutor
+from .sweep_module import DecisionSweep
+from .forecast_cache_module import ForecastCache
+from .streaming_module import StreamingPipeline
+from .portfolio_module import Portfolio
+from .ledger_module import TransactionLedger
+from .experiment_module import ExperimentRunner, SharedDataset
+from .monte_carlo_module import MonteCarloBaseline
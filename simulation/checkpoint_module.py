@@ -0,0 +1,29 @@
+import os
+import pickle
+
+'''
+Config params
+'''
+CHECKPOINT_VERSION = 1
+
+
+def write_checkpoint(path, state):
+    """Pickles state next to path and moves it into place, so a crash never leaves a truncated checkpoint."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({'version': CHECKPOINT_VERSION, 'state': state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def read_checkpoint(path):
+    """Returns the stored state, or None if there is no checkpoint at path."""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        checkpoint = pickle.load(f)
+    if checkpoint.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version in {path}")
+    return checkpoint['state']
@@ -0,0 +1,133 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from simulation.simulation_module import Simulator
+
+'''
+Attached dataset of an experiment worker, set once by _init_worker
+'''
+_worker = {}
+
+
+class SharedDataset:
+    """
+    Featured dataset stored once in shared memory: one (rows x columns) float64 block for the numeric columns
+    and one int64 block for the timestamps. Worker processes attach() to the blocks by name and get a read-only
+    DataFrame over them without copying the data.
+    """
+
+    def __init__(self, df: pd.DataFrame, date_col='timestamp'):
+        df = df.sort_values(date_col, kind='stable').reset_index(drop=True)
+        self.date_col = date_col
+        self.columns = [col for col in df.columns if col != date_col]
+        self.date_dtype = str(df[date_col].dtype)
+        self.shape = (len(df), len(self.columns))
+
+        values = df[self.columns].to_numpy(dtype=np.float64)
+        dates = df[date_col].to_numpy().view(np.int64)
+        self.values_block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        self.dates_block = shared_memory.SharedMemory(create=True, size=max(dates.nbytes, 1))
+        np.ndarray(values.shape, dtype=np.float64, buffer=self.values_block.buf)[:] = values
+        np.ndarray(dates.shape, dtype=np.int64, buffer=self.dates_block.buf)[:] = dates
+
+    def descriptor(self):
+        """Picklable description used by attach() in other processes."""
+        return {
+            'values': self.values_block.name,
+            'dates': self.dates_block.name,
+            'shape': self.shape,
+            'columns': self.columns,
+            'date_col': self.date_col,
+            'date_dtype': self.date_dtype,
+        }
+
+    @staticmethod
+    def attach(descriptor):
+        """
+        Returns (frame, blocks). The frame is only valid while the blocks are kept open.
+        """
+        blocks = []
+        for key in ('values', 'dates'):
+            blocks.append(shared_memory.SharedMemory(name=descriptor[key]))
+
+        n_rows, n_cols = descriptor['shape']
+        values = np.ndarray((n_rows, n_cols), dtype=np.float64, buffer=blocks[0].buf)
+        dates = np.ndarray((n_rows,), dtype=np.int64, buffer=blocks[1].buf)
+        values.flags.writeable = False
+        dates.flags.writeable = False
+
+        frame = pd.DataFrame(values, columns=descriptor['columns'], copy=False)
+        frame.insert(0, descriptor['date_col'], dates.view(descriptor['date_dtype']))
+        return frame, blocks
+
+    def close(self):
+        for block in (self.values_block, self.dates_block):
+            block.close()
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _init_worker(descriptor):
+    frame, blocks = SharedDataset.attach(descriptor)
+    _worker.update({'frame': frame, 'blocks': blocks})
+
+
+def _run_experiment(name, simulation_list, params, start_date, end_date):
+    simulator = Simulator(simulation_list=simulation_list, df=_worker['frame'], **params)
+    simulator.run(start_date, end_date)
+    accuracy = simulator.direction_hits / simulator.direction_total if simulator.direction_total > 0 else None
+    return {
+        'name': name,
+        'algorithm_type': simulator.algorithm_type,
+        'final_value': simulator.portfolio_value(end_date),
+        'liquidity': simulator.liquidity,
+        'trades': len(simulator.transactions),
+        'directional_accuracy': accuracy,
+        'transactions': simulator.transactions.to_frame(),
+        'equity_curve': simulator.equity_curve(),
+    }
+
+
+class ExperimentRunner:
+    """
+    Runs several Simulator configurations over one featured dataset in parallel processes.
+    The dataset is placed in shared memory once and every worker attaches to it read-only, so memory does not
+    grow with a copy of the frame per experiment.
+
+    experiments: dict name -> Simulator params for that run (algorithm_type, model_params, ...), merged over
+    the common simulator_params.
+    """
+
+    def __init__(self, df, simulation_list, experiments, n_workers=None, **simulator_params):
+        self.df = df
+        self.simulation_list = list(simulation_list)
+        self.experiments = experiments
+        self.n_workers = max(1, min(n_workers or os.cpu_count() or 1, len(experiments)))
+        self.simulator_params = simulator_params
+        self.results = {}
+
+    def run(self, start_date, end_date):
+        """Returns one summary row per experiment; transactions and equity curves are kept in results."""
+        with SharedDataset(self.df) as dataset:
+            with ProcessPoolExecutor(max_workers=self.n_workers, initializer=_init_worker,
+                                     initargs=(dataset.descriptor(),)) as pool:
+                futures = [
+                    pool.submit(_run_experiment, name, self.simulation_list,
+                                {**self.simulator_params, **params}, start_date, end_date)
+                    for name, params in self.experiments.items()
+                ]
+                for future in futures:
+                    result = future.result()
+                    self.results[result['name']] = result
+
+        summary_cols = ['name', 'algorithm_type', 'final_value', 'liquidity', 'trades', 'directional_accuracy']
+        return pd.DataFrame([{col: result[col] for col in summary_cols} for result in self.results.values()])
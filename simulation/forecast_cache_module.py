@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from utils.logging_module import EventLogger
+
+'''
+Config params
+'''
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_logger = EventLogger('simulation.forecast_cache')
+
+
+class ForecastCache:
+    """
+    On-disk forecast cache stored as a single Parquet file.
+    Entries are keyed by algorithm type, model params, asset, simulation date and the fingerprint of the data
+    visible on that date, so any change in the inputs or the configuration misses the cache. New entries are kept
+    in memory until flush(); when the file grows over max_bytes the least recently used entries are evicted.
+    """
+
+    COLUMNS = ['key', 'algorithm', 'code', 'timestamp', 'predicted', 'last_used']
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, use_logs=True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.use_logs = use_logs
+        self.hits = 0
+        self.misses = 0
+        self._clock = 0
+        self.entries = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        df = pd.read_parquet(self.path)
+        self._clock = int(df['last_used'].max()) if len(df) > 0 else 0
+        return {
+            row.key: {'algorithm': row.algorithm, 'code': row.code, 'timestamp': row.timestamp,
+                      'predicted': row.predicted, 'last_used': row.last_used}
+            for row in df.itertuples(index=False)
+        }
+
+    @staticmethod
+    def make_key(algorithm_type, model_params, asset, date, fingerprint):
+        params = json.dumps(model_params or {}, sort_keys=True, default=str)
+        raw = f"{algorithm_type}|{params}|{asset}|{pd.Timestamp(date).isoformat()}|{fingerprint}"
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._clock += 1
+        entry['last_used'] = self._clock
+        return entry['predicted']
+
+    def put(self, key, algorithm_type, asset, date, predicted):
+        self._clock += 1
+        self.entries[key] = {'algorithm': algorithm_type, 'code': asset, 'timestamp': pd.Timestamp(date),
+                             'predicted': float(predicted), 'last_used': self._clock}
+
+    def flush(self):
+        if not self.entries:
+            return
+        df = pd.DataFrame([{'key': key, **entry} for key, entry in self.entries.items()], columns=self.COLUMNS)
+        df = df.sort_values('last_used', ascending=False).reset_index(drop=True)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        df.to_parquet(self.path, index=False)
+
+        evicted = 0
+        size = os.path.getsize(self.path)
+        while size > self.max_bytes and len(df) > 0:
+            # Rows have a roughly fixed size, keep the most recently used ones that should fit
+            keep = min(int(len(df) * self.max_bytes / size), len(df) - 1)
+            for key in df['key'].iloc[keep:]:
+                del self.entries[key]
+            evicted += len(df) - keep
+            df = df.iloc[:keep]
+            df.to_parquet(self.path, index=False)
+            size = os.path.getsize(self.path)
+        if evicted:
+            self._log("[cache] Evicted %d forecasts to stay under %d bytes", evicted, self.max_bytes, event='evict',
+                      evicted=evicted)
+        self._log("[cache] Stored %d forecasts in %s (hits: %d, misses: %d)", len(df), self.path, self.hits,
+                  self.misses, event='store', forecasts=len(df), hits=self.hits, misses=self.misses)
+
+    def _log(self, msg, *args, **fields):
+        if self.use_logs:
+            _logger.info(msg, *args, **fields)
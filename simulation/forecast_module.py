@@ -0,0 +1,103 @@
+import numpy as np
+
+from prediction.registry_module import get_model_class
+from utils.logging_module import EventLogger
+from utils.metrics_module import Metrics
+
+_NO_METRICS = Metrics(enabled=False)
+
+'''
+Config params
+'''
+STATEFUL_FLAGS = ['warm_start', 'cache_order', 'online']
+_log = EventLogger('simulation.forecast')
+
+
+def build_model(algorithm_type, model_params=None):
+    model_params = model_params or {}
+    return get_model_class(algorithm_type)(**model_params)
+
+
+def is_stateful(model):
+    """
+    True for models whose forecast depends on the days they were trained before (LSTM warm_start, ARIMA
+    cache_order, SHIFT online): skipping a train call on a cache hit would change their later forecasts.
+    """
+    return any(getattr(model, flag, False) for flag in STATEFUL_FLAGS)
+
+
+def lstm_feature_cols(asset, columns):
+    feature_cols = [
+        col for col in columns
+        if col.startswith(f"{asset}_feature_")
+           or col == f"{asset}_sentiment"
+           or col == f"{asset}_volume"
+    ]
+    macro_cols = [col for col in columns if col.startswith("usa_") or col.startswith("euro_")]
+    return feature_cols + macro_cols
+
+
+def prepare_day(model, algorithm_type, assets, date, past_data, use_logs=True, horizon=1):
+    """
+    Day-level hook run before the per-asset forecasts: batched models train every asset in one call here.
+    """
+    if not getattr(model, 'batched', False):
+        return
+    try:
+        if algorithm_type == 'LSTM':
+            targets = {f"{asset}_value": lstm_feature_cols(asset, past_data.columns) for asset in assets}
+            model.train_all(past_data, targets, horizon)
+        else:
+            model.train_all(past_data, assets, horizon)
+    except Exception as e:
+        if use_logs:
+            _log.warning("[%.10s] Batched training error: %s", date, e, event='batched_training_error', date=date)
+
+
+def forecast_asset(model, algorithm_type, asset, date, past_data, use_logs=True, horizon=1, metrics=None):
+    """
+    Trains the model with past_data and returns the forecast for date, or None if the model failed.
+    With horizon > 1 it returns an array with the forecasts for date and the next horizon - 1 rows.
+    metrics: optional Metrics that times the train and predict calls of the model.
+    """
+    metrics = metrics or _NO_METRICS
+    try:
+        if use_logs:
+            _log.debug("[%.10s] Training %s", date, asset, event='train', date=date, asset=asset)
+        if algorithm_type == 'SHIFT':
+            with metrics.stage('train', asset):
+                model.train(asset, past_data)
+            with metrics.stage('predict', asset):
+                predicted_price = model.predict(asset, past_data, horizon=horizon)
+
+        elif algorithm_type == 'AR':
+            with metrics.stage('train', asset):
+                model.train(asset, past_data, horizon=horizon)
+            with metrics.stage('predict', asset):
+                predicted_price = model.predict(asset, horizon=horizon)
+
+        elif algorithm_type == 'LSTM':
+            target_col = f"{asset}_value"
+            feature_cols = lstm_feature_cols(asset, past_data.columns)
+            with metrics.stage('train', asset):
+                model.train(past_data, feature_cols=feature_cols, target_col=target_col, horizon=horizon)
+            with metrics.stage('predict', asset):
+                predicted_price = model.predict(past_data, horizon=horizon)
+
+        else:
+            with metrics.stage('train', asset):
+                model.train(past_data, target_col=f"{asset}_value")
+            with metrics.stage('predict', asset):
+                forecast = model.predict(horizon=horizon)
+            predicted_price = forecast.iloc[0] if horizon == 1 else forecast.to_numpy()
+
+        if use_logs and _log.enabled():
+            forecast_value = np.ravel(predicted_price)[0]
+            _log.info("[%.10s] Forecast for %s: %.2f", date, asset, forecast_value, event='forecast', date=date,
+                      asset=asset, predicted=forecast_value)
+    except Exception as e:
+        if use_logs:
+            _log.warning("[%.10s] Prediction error for %s: %s", date, asset, e, event='prediction_error', date=date,
+                         asset=asset, error=str(e))
+        return None
+    return predicted_price
@@ -0,0 +1,155 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+'''
+Config params
+'''
+CHUNK_SIZE = 4096
+
+
+class TransactionLedger:
+    """
+    Columnar transaction log. Trades are appended to per-column lists and sealed into typed DataFrame chunks
+    every chunk_size rows. With path set, sealed chunks are written as numbered Parquet files in that directory
+    and dropped from memory, so long runs keep at most one chunk of trades in RAM.
+    A directory that already holds part files is refused unless overwrite=True (delete them) or append=True
+    (continue that ledger, e.g. when resuming a run) is passed.
+    """
+
+    COLUMNS = ['timestamp', 'code', 'price', 'quantity', 'type']
+
+    def __init__(self, path=None, chunk_size=CHUNK_SIZE, overwrite=False, append=False):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.chunks = []
+        self.n_chunks = 0
+        self.n_rows = 0
+        self.n_stored = 0
+        self._pending = {col: [] for col in self.COLUMNS}
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            parts = self._part_files()
+            if parts and append:
+                self.n_chunks = len(parts)
+                self.n_stored = sum(len(pd.read_parquet(part, columns=['timestamp'])) for part in parts)
+                self.n_rows = self.n_stored
+            elif parts and overwrite:
+                self.truncate(0)
+            elif parts:
+                raise ValueError(f"Ledger directory {path} is not empty, pass overwrite=True to replace it "
+                                 f"or append=True to continue it")
+
+    def _part_files(self):
+        return sorted(
+            os.path.join(self.path, filename) for filename in os.listdir(self.path)
+            if filename.startswith('part-') and filename.endswith('.parquet')
+        )
+
+    def truncate(self, n_chunks):
+        """Keeps the first n_chunks stored chunks and drops every later one plus the pending trades."""
+        if self.path is None:
+            raise ValueError("Only ledgers stored on disk can be truncated")
+        parts = self._part_files()
+        if len(parts) < n_chunks:
+            raise ValueError(f"Ledger directory {self.path} holds {len(parts)} chunks, expected {n_chunks}")
+        for part in parts[n_chunks:]:
+            os.remove(part)
+        self.n_chunks = n_chunks
+        self.n_stored = sum(len(pd.read_parquet(part, columns=['timestamp'])) for part in parts[:n_chunks])
+        self.n_rows = self.n_stored
+        self._pending = {col: [] for col in self.COLUMNS}
+
+    def __len__(self):
+        return self.n_rows
+
+    def append(self, timestamp, code, price, quantity, op_type):
+        for col, value in zip(self.COLUMNS, (timestamp, code, price, quantity, op_type)):
+            self._pending[col].append(value)
+        self.n_rows += 1
+        if len(self._pending['timestamp']) >= self.chunk_size:
+            self._seal()
+
+    def extend(self, df):
+        """Appends the trades of a frame with the ledger columns (e.g. one returned by to_frame)."""
+        for row in df[self.COLUMNS].itertuples(index=False):
+            self.append(*row)
+
+    def _seal(self):
+        if not self._pending['timestamp']:
+            return
+        chunk = pd.DataFrame({
+            'timestamp': pd.to_datetime(self._pending['timestamp']),
+            'code': self._pending['code'],
+            'price': np.array(self._pending['price'], dtype=float),
+            'quantity': np.array(self._pending['quantity'], dtype=np.int64),
+            'type': self._pending['type'],
+        })
+        self._pending = {col: [] for col in self.COLUMNS}
+        if self.path is None:
+            self.chunks.append(chunk)
+        else:
+            chunk.to_parquet(os.path.join(self.path, f"part-{self.n_chunks:06d}.parquet"), index=False)
+            self.n_stored += len(chunk)
+        self.n_chunks += 1
+
+    def flush(self):
+        """Seals the pending trades (and writes them when the ledger streams to disk)."""
+        self._seal()
+
+    def _stored(self):
+        if self.path is None or self.n_stored == 0:
+            return []
+        return [pd.read_parquet(os.path.join(self.path, f"part-{i:06d}.parquet")) for i in range(self.n_chunks)]
+
+    def to_frame(self):
+        pending = pd.DataFrame(self._pending, columns=self.COLUMNS)
+        frames = self._stored() + self.chunks + [pending]
+        frames = [frame for frame in frames if len(frame) > 0]
+        if not frames:
+            return pd.DataFrame(columns=self.COLUMNS)
+        df = pd.concat(frames, ignore_index=True)
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        return df
+
+    def records(self, start=0):
+        """Trades from row start onwards as a list of dicts."""
+        if start >= self.n_rows:
+            return []
+        n_sealed = self.n_rows - len(self._pending['timestamp'])
+        if start >= n_sealed:
+            offset = start - n_sealed
+            return [dict(zip(self.COLUMNS, values)) for values in zip(*(self._pending[col][offset:]
+                                                                        for col in self.COLUMNS))]
+        return self.to_frame().iloc[start:].to_dict('records')
+
+    def equity_curve(self, dates, prices, initial_liquidity):
+        """
+        Mark-to-market value of the account at the end of every date.
+        prices: DataFrame indexed by dates with one column per asset (as-of prices).
+        Returns a DataFrame with liquidity, holdings and equity per date.
+        """
+        dates = pd.DatetimeIndex(pd.to_datetime(dates))
+        trades = self.to_frame()
+        if trades.empty:
+            liquidity = np.full(len(dates), float(initial_liquidity))
+            return pd.DataFrame({'liquidity': liquidity, 'holdings': 0.0, 'equity': liquidity},
+                                index=dates.rename('timestamp'))
+        sign = np.where(trades['type'] == 'buy', 1, -1)
+        trades = trades.assign(
+            signed_qty=sign * trades['quantity'].to_numpy(dtype=np.int64),
+            cash_flow=-sign * trades['price'].to_numpy(dtype=float) * trades['quantity'].to_numpy(dtype=float)
+        )
+        day = dates[np.clip(np.searchsorted(dates, trades['timestamp'], side='right') - 1, 0, None)]
+        positions = (
+            trades.pivot_table(index=day, columns='code', values='signed_qty', aggfunc='sum')
+            .reindex(index=dates, columns=prices.columns, fill_value=0).fillna(0).cumsum()
+        )
+        liquidity = initial_liquidity + trades.groupby(day)['cash_flow'].sum().reindex(dates, fill_value=0).cumsum()
+        holdings = (positions.to_numpy() * prices.reindex(dates).fillna(0).to_numpy()).sum(axis=1)
+        return pd.DataFrame({
+            'liquidity': liquidity.to_numpy(),
+            'holdings': holdings,
+            'equity': liquidity.to_numpy() + holdings,
+        }, index=dates.rename('timestamp'))
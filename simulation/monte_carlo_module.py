@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+'''
+Config params
+'''
+VOLATILITY = 0.02
+QUANTILES = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+
+
+class MonteCarloBaseline:
+    """
+    Null distribution of a Simulator setup under random forecasts.
+    Every path is one backtest with the RandomPredictiveModel rule (last known price times 1 + N(0, volatility))
+    over the simulator's assets, dates, liquidity and DecisionManager. All paths advance together as NumPy
+    arrays: the forecasts of a day are drawn as one (paths x assets) matrix and the decisions of each asset are
+    applied to every path with DecisionManager.decide_paths, in the same asset order as Simulator.run.
+    One forecast is drawn per day, as in a run with retrain_every=1.
+    volatility: defaults to the one of the simulator's model, if it has any.
+    """
+
+    def __init__(self, simulator, n_paths=1000, volatility=None, seed=None):
+        self.simulator = simulator
+        self.n_paths = n_paths
+        default = getattr(simulator.model, 'volatility', VOLATILITY)
+        self.volatility = default if volatility is None else volatility
+        self.rng = np.random.default_rng(seed)
+        self.results = None
+
+    def _simulation_dates(self, start_date, end_date):
+        dates = pd.date_range(pd.to_datetime(start_date), pd.to_datetime(end_date), freq='D')
+        if not self.simulator.operate_in_weekends:
+            dates = dates[dates.dayofweek < 5]
+        return dates
+
+    def _day_prices(self, dates):
+        """Base price of the forecasts (last known value before each date), current and previous day prices."""
+        sim = self.simulator
+        positions = sim.store.positions(dates)
+        values = sim.store.frame[[f"{asset}_value" for asset in sim.assets]].ffill().to_numpy(dtype=float)
+        base = np.full((len(dates), len(sim.assets)), np.nan)
+        # Same warm-up as the simulator: no forecasts with fewer than 40 rows of history
+        ready = positions >= 40
+        base[ready] = values[positions[ready] - 1]
+        yesterdays = dates - pd.Timedelta(days=1)
+        current = sim.prices.get_prices(dates, sim.assets).to_numpy()
+        previous = sim.prices.get_prices(yesterdays, sim.assets).to_numpy()
+        # Days before the first date have no previous price (None in the simulator) and are not counted
+        has_previous = yesterdays.to_numpy(dtype='datetime64[ns]') >= sim.prices.dates[0]
+        return base, current, previous, has_previous
+
+    def run(self, start_date, end_date):
+        """
+        Returns one row per path with its final_value, liquidity, trades and directional_accuracy.
+        """
+        sim = self.simulator
+        decision_manager = sim.decision_manager
+        dates = self._simulation_dates(start_date, end_date)
+        base, current, previous, has_previous = self._day_prices(dates)
+        n_assets = len(sim.assets)
+
+        liquidity = np.full(self.n_paths, float(sim.initial_liquidity))
+        quantity = np.zeros((self.n_paths, n_assets), dtype=np.int64)
+        avg_price = np.zeros((self.n_paths, n_assets))
+        trades = np.zeros(self.n_paths, dtype=np.int64)
+        hits = np.zeros(self.n_paths, dtype=np.int64)
+        total = 0
+
+        for day in range(len(dates)):
+            forecast = np.isfinite(base[day])
+            if not forecast.any():
+                continue
+            returns = self.rng.normal(0, self.volatility, (self.n_paths, int(forecast.sum())))
+            predicted = np.full((self.n_paths, n_assets), np.nan)
+            predicted[:, forecast] = base[day, forecast] * (1 + returns)
+
+            counted = forecast & has_previous[day]
+            with np.errstate(invalid='ignore'):
+                hit = (current[day] - previous[day]) * (predicted - previous[day]) > 0
+            hits += (hit & counted).sum(axis=1)
+            total += int(counted.sum())
+
+            for asset in np.flatnonzero(forecast & np.isfinite(current[day])):
+                result = decision_manager.decide_paths(predicted[:, asset], current[day, asset], liquidity,
+                                                       quantity[:, asset], avg_price[:, asset], self.rng)
+                liquidity = result['liquidity']
+                quantity[:, asset] = result['quantity']
+                avg_price[:, asset] = result['avg_price']
+                trades += (result['buy'] > 0) | (result['sell'] > 0)
+
+        final_prices = np.nan_to_num(sim.prices.get_prices([pd.to_datetime(end_date)], sim.assets).to_numpy()[0])
+        self.results = pd.DataFrame({
+            'final_value': liquidity + quantity @ final_prices,
+            'liquidity': liquidity,
+            'trades': trades,
+            'directional_accuracy': hits / total if total > 0 else np.nan,
+        })
+        return self.results
+
+    def summary(self, quantiles=QUANTILES):
+        """Mean, standard deviation and quantiles of the final value and the directional accuracy."""
+        if self.results is None:
+            raise ValueError("No paths simulated, call run() first")
+        cols = ['final_value', 'directional_accuracy']
+        stats = self.results[cols].quantile(quantiles)
+        stats.index = [f"q{q:g}" for q in quantiles]
+        return pd.concat([self.results[cols].agg(['mean', 'std']), stats])
+
+    def compare(self, final_value, directional_accuracy=None):
+        """
+        Share of random paths doing at least as well as an observed run (an empirical one-sided p-value).
+        """
+        if self.results is None:
+            raise ValueError("No paths simulated, call run() first")
+        comparison = {
+            'final_value': float(final_value),
+            'final_value_p': float((self.results['final_value'] >= final_value).mean()),
+        }
+        if directional_accuracy is not None:
+            comparison['directional_accuracy'] = directional_accuracy
+            comparison['directional_accuracy_p'] = float(
+                (self.results['directional_accuracy'] >= directional_accuracy).mean())
+        return comparison
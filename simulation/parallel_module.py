@@ -0,0 +1,95 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from simulation.forecast_module import build_model, forecast_asset
+
+'''
+State of a process worker, set once by _init_worker
+'''
+_worker = {}
+
+
+def _init_worker(store, algorithm_type, model_params, use_logs, n_threads):
+    _worker.update({
+        'store': store,
+        'algorithm_type': algorithm_type,
+        'model_params': model_params,
+        'use_logs': use_logs,
+        'models': {},
+    })
+    if algorithm_type == 'LSTM':
+        # Every worker gets its own TensorFlow runtime, so split the cores between them
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(n_threads)
+
+
+def _forecast_in_worker(asset, date, position, horizon=1):
+    models = _worker['models']
+    if asset not in models:
+        models[asset] = build_model(_worker['algorithm_type'], _worker['model_params'])
+    past_data = _worker['store'].history(position)
+    return forecast_asset(models[asset], _worker['algorithm_type'], asset, date, past_data, _worker['use_logs'],
+                          horizon)
+
+
+class AssetExecutor:
+    """
+    Forecasts every asset of a simulated day concurrently.
+    - process: each asset is pinned to one single-process worker, so per-asset model state (warm-started
+      networks, cached orders, online coefficients) stays in the same process across days.
+    - thread: one model instance per asset, shared data, forecasts run in a thread pool.
+    Forecasts are returned keyed by asset; applying them in a fixed order is left to the caller.
+    """
+
+    def __init__(self, assets, store, algorithm_type, model_params=None, use_logs=True, kind='process',
+                 n_workers=None, start_method=None, metrics=None):
+        model_params = model_params or {}
+        self.assets = list(assets)
+        self.store = store
+        self.algorithm_type = algorithm_type
+        self.use_logs = use_logs
+        self.kind = kind
+        self.metrics = metrics
+        self.n_workers = max(1, min(n_workers or os.cpu_count() or 1, len(self.assets)))
+
+        if kind == 'process':
+            context = multiprocessing.get_context(start_method)
+            n_threads = max(1, (os.cpu_count() or 1) // self.n_workers)
+            self.pools = [
+                ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(store, algorithm_type, model_params, use_logs, n_threads)
+                )
+                for _ in range(self.n_workers)
+            ]
+            self.worker_of = {asset: i % self.n_workers for i, asset in enumerate(self.assets)}
+        elif kind == 'thread':
+            self.pools = [ThreadPoolExecutor(max_workers=self.n_workers)]
+            self.models = {asset: build_model(algorithm_type, model_params) for asset in self.assets}
+        else:
+            raise ValueError(f"Unknown executor: {kind}")
+
+    def forecast_day(self, date, position, assets=None, horizon=1):
+        assets = self.assets if assets is None else assets
+        if self.kind == 'process':
+            futures = {
+                asset: self.pools[self.worker_of[asset]].submit(_forecast_in_worker, asset, date, position,
+                                                                   horizon)
+                for asset in assets
+            }
+        else:
+            past_data = self.store.history(position)
+            futures = {
+                asset: self.pools[0].submit(forecast_asset, self.models[asset], self.algorithm_type, asset, date,
+                                            past_data, self.use_logs, horizon, self.metrics)
+                for asset in assets
+            }
+        return {asset: future.result() for asset, future in futures.items()}
+
+    def shutdown(self):
+        for pool in self.pools:
+            pool.shutdown()
@@ -0,0 +1,53 @@
+import numpy as np
+
+
+class Portfolio:
+    """
+    Holdings as one quantity and one average price array, indexed by the position of the asset in assets.
+    It keeps the read side of the old dict of dicts (asset in portfolio, portfolio[asset]['avg_price'], keys())
+    so DecisionManager.decide_action works with it unchanged.
+    """
+
+    def __init__(self, assets):
+        self.assets = list(assets)
+        self.index = {asset: i for i, asset in enumerate(self.assets)}
+        self.quantity = np.zeros(len(self.assets), dtype=np.int64)
+        self.avg_price = np.zeros(len(self.assets))
+
+    def __contains__(self, asset):
+        i = self.index.get(asset)
+        return i is not None and self.quantity[i] > 0
+
+    def __getitem__(self, asset):
+        if asset not in self:
+            raise KeyError(asset)
+        i = self.index[asset]
+        return {'quantity': int(self.quantity[i]), 'avg_price': float(self.avg_price[i])}
+
+    def __len__(self):
+        return int(np.count_nonzero(self.quantity))
+
+    def __bool__(self):
+        return bool(self.quantity.any())
+
+    def keys(self):
+        return [self.assets[i] for i in np.flatnonzero(self.quantity)]
+
+    def buy(self, asset, qty, price):
+        i = self.index[asset]
+        if self.quantity[i] == 0:
+            self.avg_price[i] = price
+        else:
+            total_qty = self.quantity[i] + qty
+            self.avg_price[i] = ((self.quantity[i] * self.avg_price[i]) + (qty * price)) / total_qty
+        self.quantity[i] += qty
+
+    def sell(self, asset):
+        """Closes the position of asset."""
+        i = self.index[asset]
+        self.quantity[i] = 0
+        self.avg_price[i] = 0.0
+
+    def value(self, prices):
+        """prices: array aligned with assets. Missing prices (NaN) count as 0."""
+        return float(np.nan_to_num(np.asarray(prices, dtype=float)) @ self.quantity)
@@ -1,22 +1,56 @@
-import pandas as pd
+import random
 from datetime import timedelta
 
+import numpy as np
+import pandas as pd
+
 from decision import DecisionManager
-from prediction import LSTMForecastModel
-from prediction.random_prediction_module import RandomPredictiveModel
-from prediction.shift_supervised_prediction_module import ShiftPredictiveModel
+from utils.logging_module import EventLogger
+from utils.metrics_module import Metrics
 from utils.utils_module import Utils
-from prediction.arima_prediction_module import TimeSeriesPredictiveModel
+from utils.price_index_module import PriceIndex
+from simulation.checkpoint_module import read_checkpoint, write_checkpoint
+from simulation.forecast_module import build_model, forecast_asset, is_stateful, prepare_day
+from simulation.ledger_module import TransactionLedger
+from simulation.parallel_module import AssetExecutor
+from simulation.portfolio_module import Portfolio
+from simulation.walk_forward_module import WalkForwardStore
 
 
 class Simulator:
+    """
+    retrain_every: number of data rows a trained model serves. With N > 1 the model of each asset is trained
+    once, forecasts the next N rows and those forecasts are reused until they run out. The forecast cache is
+    only used with retrain_every=1, since multi-step forecasts depend on the day the model was trained, and it
+    is bypassed for stateful models (LSTM warm_start, ARIMA cache_order, SHIFT online), whose state would
+    diverge from an uncached run if cache hits skipped their training.
+    ledger_path: optional directory where the transaction ledger streams its Parquet chunks. An existing ledger
+    there is refused unless overwrite_ledger=True, or continued when the run resumes from its checkpoint.
+    checkpoint_path: optional file where run() saves its state every checkpoint_every simulated days and at the
+    end. run(resume=True) restores it and continues after the last checkpointed day, either to finish an
+    interrupted run or to extend a finished one to a later end date. Model state is only checkpointed for
+    serial runs; parallel workers start with fresh models after a resume.
+    instrument=True times every stage of the run (wall and CPU, per asset) and counts skipped days, prediction
+    errors, reused forecasts and trades in self.metrics; metrics_path dumps them (JSON or CSV) at the end of
+    run(), profile_stage runs one stage (e.g. 'train') under cProfile. Train/predict timings are not collected
+    inside process workers.
+    """
+
     def __init__(self, simulation_list, df, initial_liquidity, algorithm_type,
                  sl_min, sl_max, tp_min, tp_max,
-                 reserve=0.1, operate_in_weekends=False, use_logs=True):
+                 reserve=0.1, operate_in_weekends=False, use_logs=True, model_params=None,
+                 parallel=False, executor='process', n_workers=None, forecast_cache=None, retrain_every=1,
+                 ledger_path=None, checkpoint_path=None, checkpoint_every=20, instrument=False,
+                 metrics_path=None, profile_stage=None, overwrite_ledger=False):
+        if retrain_every < 1:
+            raise ValueError("retrain_every must be at least 1")
         self.direction_total = 0
         self.direction_hits = 0
         self.assets = simulation_list
-        self.df = df.set_index('timestamp')
+        self.store = WalkForwardStore(df)
+        self.df = self.store.frame.set_index('timestamp')
+        self.prices = PriceIndex(self.df)
+        self.initial_liquidity = initial_liquidity
         self.liquidity = initial_liquidity
         self.reserve = reserve
         self.asset_value = 0
@@ -27,86 +61,316 @@ class Simulator:
         self.tp_max = tp_max
         self.sl_min = sl_min
         self.sl_max = sl_max
-        self.portfolio = {}
-        self.transactions = []
+        self.model_params = model_params or {}
+        self.parallel = parallel
+        self.executor = executor
+        self.n_workers = n_workers
+        self.forecast_cache = forecast_cache
+        self.retrain_every = retrain_every
+        self.forecast_plans = {}
+        self.ledger_path = ledger_path
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self.last_date = None
+        self.metrics = Metrics(enabled=instrument, scope=algorithm_type, profile_stage=profile_stage)
+        self.metrics_path = metrics_path
+        self.log = EventLogger('simulation', use_logs)
+        self.portfolio = Portfolio(simulation_list)
+        self.overwrite_ledger = overwrite_ledger
+        # Next to a checkpoint an existing ledger may belong to a resumable run, run() decides once it knows
+        self.transactions = TransactionLedger(ledger_path, overwrite=overwrite_ledger,
+                                              append=checkpoint_path is not None and not overwrite_ledger)
+        self.simulated_dates = []
+        self.forecasts = []
         self.model = self.get_model()
+        self.use_cache = forecast_cache is not None and retrain_every == 1 and not is_stateful(self.model)
+        if forecast_cache is not None and is_stateful(self.model):
+            self.log.warning("Forecast cache bypassed: %s model is stateful", algorithm_type,
+                             event='cache_bypassed')
         self.decision_manager = DecisionManager(
             sl_min=sl_min,
             sl_max=sl_max,
             tp_min=tp_min,
-            tp_max=tp_max
+            tp_max=tp_max,
+            reserve=reserve
         )
 
     def get_model(self):
-        if self.algorithm_type == 'ARIMA':
-            return TimeSeriesPredictiveModel()
-        elif self.algorithm_type == 'RANDOM':
-            return RandomPredictiveModel()
-        elif self.algorithm_type == 'SHIFT':
-            return ShiftPredictiveModel()
-        elif self.algorithm_type == 'LSTM':
-            return LSTMForecastModel()
-        raise NotImplementedError("Modelo no implementado")
-
-    def run(self, start_date, end_date):
+        return build_model(self.algorithm_type, self.model_params)
+
+    def run(self, start_date, end_date, resume=False):
         utils = Utils()
         current_date = pd.to_datetime(start_date)
         end_date = pd.to_datetime(end_date)
-        print(f"Starting simulation from {start_date} to {end_date}")
+        if resume and self.checkpoint_path is not None and self.load_checkpoint():
+            current_date = max(current_date, self.last_date + timedelta(days=1))
+            self.log.info("Resuming simulation after %.10s", self.last_date, event='resume', date=self.last_date)
+        elif not self.simulated_dates and len(self.transactions) > 0:
+            raise ValueError(f"Ledger directory {self.ledger_path} holds trades of an earlier run, pass "
+                             f"overwrite_ledger=True or resume=True")
+        self.log.info("Starting simulation from %.10s to %.10s", current_date, end_date, event='start',
+                      date=current_date)
 
+        simulation_dates = []
         while current_date <= end_date:
-            if not self.operate_in_weekends and utils.is_weekend(current_date):
-                current_date += timedelta(days=1)
-                continue
+            if self.operate_in_weekends or not utils.is_weekend(current_date):
+                simulation_dates.append(current_date)
+            else:
+                self.metrics.count('skipped_days')
+            current_date += timedelta(days=1)
+        positions = self.store.positions(simulation_dates)
 
-            for asset in self.assets:
-                self._simulate_asset(asset, current_date)
+        executor = self._create_executor() if self.parallel else None
+        try:
+            for i, (current_date, position) in enumerate(zip(simulation_dates, positions)):
+                self._simulate_day(current_date, position, executor)
+                if self.checkpoint_path is not None and (i + 1) % self.checkpoint_every == 0:
+                    with self.metrics.stage('checkpoint'):
+                        self.save_checkpoint()
+            if self.checkpoint_path is not None and simulation_dates:
+                with self.metrics.stage('checkpoint'):
+                    self.save_checkpoint()
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            self.transactions.flush()
+            if self.forecast_cache is not None:
+                self.forecast_cache.flush()
+            if self.metrics_path is not None:
+                self.metrics.dump(self.metrics_path)
 
-            current_date += timedelta(days=1)
         if self.direction_total > 0:
             accuracy = (self.direction_hits / self.direction_total) * 100
-            print(f"Directional accuracy: {accuracy:.2f}% ({self.direction_hits}/{self.direction_total})")
+            self.log.info("Directional accuracy: %.2f%% (%d/%d)", accuracy, self.direction_hits, self.direction_total,
+                          event='accuracy', accuracy=accuracy, hits=self.direction_hits, total=self.direction_total)
 
-    def _simulate_asset(self, asset, date):
-        utils = Utils()
+    def step(self, date):
+        """
+        Simulates a single day, serially, with the data currently in the store (see append_data).
+        Model and portfolio state carry over between calls. Returns the transactions of that day.
+        """
+        date = pd.to_datetime(date)
+        n_transactions = len(self.transactions)
+        if self.operate_in_weekends or not Utils().is_weekend(date):
+            self._simulate_day(date, self.store.position(date))
+        return self.transactions.records(n_transactions)
 
-        past_data = self.df.loc[self.df.index < date].reset_index()
-        if len(past_data) < 40:
+    def save_checkpoint(self, path=None):
+        """Saves the state after the last simulated day."""
+        if self.last_date is None:
             return
+        self.transactions.flush()
+        position = self.store.position(self.last_date + timedelta(days=1))
+        write_checkpoint(path or self.checkpoint_path, {
+            'algorithm_type': self.algorithm_type,
+            'model_params': self.model_params,
+            'assets': self.assets,
+            'last_date': self.last_date,
+            'position': position,
+            'fingerprint': self.store.fingerprint(position),
+            'liquidity': self.liquidity,
+            'quantity': self.portfolio.quantity,
+            'avg_price': self.portfolio.avg_price,
+            # A ledger on disk is already flushed, only its chunk count is needed to resume it
+            'transactions': self.transactions.to_frame() if self.ledger_path is None else None,
+            'ledger_chunks': self.transactions.n_chunks,
+            'forecasts': self.forecasts,
+            'simulated_dates': self.simulated_dates,
+            'direction_hits': self.direction_hits,
+            'direction_total': self.direction_total,
+            'forecast_plans': self.forecast_plans,
+            'model': None if self.parallel else self.model,
+            'rng': (np.random.get_state(), random.getstate()),
+        })
+        self.log.info("[checkpoint] Saved state after %.10s", self.last_date, event='checkpoint', date=self.last_date)
 
-        try:
-            print(f"[{date.date()}] Training {asset}")
-            if self.algorithm_type == 'SHIFT':
-                self.model.train(asset, past_data)
-                predicted_price = self.model.predict(asset, past_data)
-
-            elif self.algorithm_type == 'LSTM':
-                target_col = f"{asset}_value"
-                feature_cols = [
-                    col for col in past_data.columns
-                    if col.startswith(f"{asset}_feature_")
-                       or col == f"{asset}_sentiment"
-                       or col == f"{asset}_volume"
+    def load_checkpoint(self, path=None):
+        """
+        Restores the state saved by save_checkpoint. Returns False if there is no checkpoint.
+        The checkpoint must come from the same algorithm, params and assets, over the same data up to its last day.
+        """
+        path = path or self.checkpoint_path
+        state = read_checkpoint(path)
+        if state is None:
+            return False
+        if (state['algorithm_type'] != self.algorithm_type or state['model_params'] != self.model_params
+                or state['assets'] != self.assets):
+            raise ValueError(f"Checkpoint {path} was written by a different simulation setup")
+        if state['position'] > len(self.store.frame) or self.store.fingerprint(state['position']) != state['fingerprint']:
+            raise ValueError(f"Data up to {state['last_date'].date()} changed since checkpoint {path}")
+
+        self.last_date = state['last_date']
+        self.liquidity = state['liquidity']
+        self.portfolio.quantity = state['quantity'].copy()
+        self.portfolio.avg_price = state['avg_price'].copy()
+        if state['transactions'] is None:
+            if self.ledger_path is None:
+                raise ValueError(f"Checkpoint {path} refers to a ledger on disk, set ledger_path to resume it")
+            self.transactions = TransactionLedger(self.ledger_path, append=True)
+            self.transactions.truncate(state['ledger_chunks'])
+        else:
+            self.transactions = TransactionLedger(self.ledger_path, overwrite=True)
+            self.transactions.extend(state['transactions'])
+        self.forecasts = state['forecasts']
+        self.simulated_dates = state['simulated_dates']
+        self.direction_hits = state['direction_hits']
+        self.direction_total = state['direction_total']
+        self.forecast_plans = state['forecast_plans']
+        if state['model'] is not None:
+            self.model = state['model']
+        np.random.set_state(state['rng'][0])
+        random.setstate(state['rng'][1])
+        self.log.info("[checkpoint] Loaded state after %.10s", self.last_date, event='checkpoint_loaded',
+                      date=self.last_date)
+        return True
+
+    def append_data(self, rows):
+        """Adds new dated rows (same columns as the simulation dataset) after the last stored date."""
+        self.store.append(rows)
+        self.prices.append(rows)
+        self.df = self.store.frame.set_index('timestamp')
+
+    def equity_curve(self):
+        """Liquidity, holdings value and equity at the close of every simulated day."""
+        prices = self.prices.get_prices(self.simulated_dates, self.assets)
+        return self.transactions.equity_curve(self.simulated_dates, prices, self.initial_liquidity)
+
+    def portfolio_value(self, date):
+        """Liquidity plus the holdings valued at the as-of prices of date."""
+        prices = self.prices.get_prices([date], self.assets).iloc[0].to_numpy()
+        return self.liquidity + self.portfolio.value(prices)
+
+    def _create_executor(self):
+        return AssetExecutor(
+            assets=self.assets,
+            store=self.store,
+            algorithm_type=self.algorithm_type,
+            model_params=self.model_params,
+            use_logs=self.use_logs,
+            kind=self.executor,
+            n_workers=self.n_workers,
+            metrics=self.metrics
+        )
+
+    def _simulate_day(self, date, position, executor=None):
+        self.simulated_dates.append(date)
+        self.last_date = date
+        if position < 40:
+            self.metrics.count('skipped_days')
+        with self.metrics.stage('day'):
+            self._simulate_positions(date, position, executor)
+
+    def _simulate_positions(self, date, position, executor):
+        if executor is None:
+            with self.metrics.stage('slice'):
+                past_data = self.store.history(position)
+            if len(past_data) >= 40 and getattr(self.model, 'batched', False):
+                pending = [
+                    asset for asset in self.assets
+                    if self._planned_forecast(asset, position) is None
+                    and self._cached_forecast(asset, date, position) is None
                 ]
-                macro_cols = [col for col in past_data.columns if col.startswith("usa_") or col.startswith("euro_")]
-                feature_cols += macro_cols
-                self.model.train(past_data, feature_cols=feature_cols, target_col=target_col)
-                predicted_price = self.model.predict(past_data)
+                if pending:
+                    with self.metrics.stage('train'):
+                        prepare_day(self.model, self.algorithm_type, pending, date, past_data, self.use_logs,
+                                    self.retrain_every)
+            for asset in self.assets:
+                self._simulate_asset(asset, date, past_data)
+            return
 
-            else:
-                self.model.train(past_data, target_col=f"{asset}_value")
-                forecast = self.model.predict(horizon=1)
-                predicted_price = forecast.iloc[0]
-
-            print(f"[{date.date()}] Forecast for {asset}: {predicted_price:.2f}")
-        except Exception as e:
-            if self.use_logs:
-                print(f"[{date.date()}] Prediction error for {asset}: {e}")
+        if position < 40:
+            return
+        forecasts = {}
+        for asset in self.assets:
+            forecasts[asset] = self._planned_forecast(asset, position)
+            if forecasts[asset] is None:
+                forecasts[asset] = self._cached_forecast(asset, date, position)
+        missing = [asset for asset, forecast in forecasts.items() if forecast is None]
+        if missing:
+            with self.metrics.stage('forecast_day'):
+                computed = executor.forecast_day(date, position, missing, self.retrain_every)
+            for asset, forecast in computed.items():
+                if forecast is None:
+                    self.metrics.count('prediction_errors', asset)
+                forecasts[asset] = self._plan_forecasts(asset, position, forecast)
+                self._store_forecast(asset, date, position, forecasts[asset])
+        # Same asset order as the serial run, so liquidity evolves identically
+        for asset in self.assets:
+            if forecasts[asset] is not None:
+                self._apply_forecast(asset, date, forecasts[asset])
+
+    def _simulate_asset(self, asset, date, past_data=None):
+        if past_data is None:
+            past_data = self.store.history_before(date)
+        if len(past_data) < 40:
+            return
+
+        position = len(past_data)
+        predicted_price = self._planned_forecast(asset, position)
+        if predicted_price is None:
+            predicted_price = self._cached_forecast(asset, date, position)
+        if predicted_price is None:
+            forecast = forecast_asset(self.model, self.algorithm_type, asset, date, past_data, self.use_logs,
+                                      self.retrain_every, self.metrics)
+            predicted_price = self._plan_forecasts(asset, position, forecast)
+            self._store_forecast(asset, date, position, predicted_price)
+        if predicted_price is None:
+            self.metrics.count('prediction_errors', asset)
             return
+        self._apply_forecast(asset, date, predicted_price)
 
-        real_price = utils.get_price(self.df, date, asset)
-        yesterday = date - timedelta(days=1)
-        yesterday_price = utils.get_price(self.df, yesterday, asset)
+    def _plan_forecasts(self, asset, position, forecast):
+        """Keeps the multi-step forecast of a freshly trained model and returns the one for position."""
+        if forecast is None or self.retrain_every == 1:
+            return forecast
+        forecast = np.ravel(forecast)
+        self.forecast_plans[asset] = (position, forecast)
+        return forecast[0]
+
+    def _planned_forecast(self, asset, position):
+        plan = self.forecast_plans.get(asset)
+        if plan is None:
+            return None
+        train_position, forecast = plan
+        offset = position - train_position
+        if 0 <= offset < len(forecast):
+            if offset > 0:
+                self.metrics.count('reused_forecasts', asset)
+            return forecast[offset]
+        return None
+
+    def _forecast_key(self, asset, date, position):
+        return self.forecast_cache.make_key(
+            self.algorithm_type, self.model_params, asset, date, self.store.fingerprint(position)
+        )
+
+    def _cached_forecast(self, asset, date, position):
+        if not self.use_cache:
+            return None
+        with self.metrics.stage('cache', asset):
+            predicted = self.forecast_cache.get(self._forecast_key(asset, date, position))
+        if predicted is not None:
+            self.metrics.count('cache_hits', asset)
+        return predicted
+
+    def _store_forecast(self, asset, date, position, predicted_price):
+        if not self.use_cache or predicted_price is None:
+            return
+        key = self._forecast_key(asset, date, position)
+        self.forecast_cache.put(key, self.algorithm_type, asset, date, predicted_price)
+
+    def _apply_forecast(self, asset, date, predicted_price):
+        with self.metrics.stage('price_lookup', asset):
+            real_price = self.prices.get_price(date, asset)
+            yesterday = date - timedelta(days=1)
+            yesterday_price = self.prices.get_price(yesterday, asset)
+        self.forecasts.append({
+            'timestamp': date,
+            'code': asset,
+            'predicted': predicted_price,
+            'current': real_price,
+            'previous': yesterday_price
+        })
         if yesterday_price is not None:
             real_diff = real_price - yesterday_price
             predicted_diff = predicted_price - yesterday_price
@@ -114,21 +378,24 @@ class Simulator:
                 self.direction_hits += 1
             self.direction_total += 1
         if real_price is None:
-            print(f"[{date.date()}] No price data for {asset}")
+            self.log.warning("[%.10s] No price data for %s", date, asset, event='missing_price', date=date,
+                             asset=asset)
             return
 
         self._apply_decision_logic(asset, predicted_price, real_price, date)
 
     def _apply_decision_logic(self, asset, predicted, current, date):
-        action = self.decision_manager.decide_action(
-            asset=asset,
-            predicted=predicted,
-            current=current,
-            liquidity=self.liquidity,
-            portfolio=self.portfolio
-        )
-        print(
-            f"[{date.date()}] {asset} | Current: {current:.2f} | Predicted: {predicted:.2f} | Action: {action['type']}")
+        with self.metrics.stage('decision', asset):
+            action = self.decision_manager.decide_action(
+                asset=asset,
+                predicted=predicted,
+                current=current,
+                liquidity=self.liquidity,
+                portfolio=self.portfolio
+            )
+        self.log.info("[%.10s] %s | Current: %.2f | Predicted: %.2f | Action: %s", date, asset, current, predicted,
+                      action['type'], event='decision', date=date, asset=asset, current=current,
+                      predicted=predicted, action=action['type'])
 
         if action['type'] is None or action['quantity'] <= 0:
             return
@@ -146,16 +413,10 @@ class Simulator:
             total_cost = price * qty
             self.liquidity -= total_cost
 
-            if asset not in self.portfolio:
-                self.portfolio[asset] = {'quantity': qty, 'avg_price': price}
-            else:
-                p = self.portfolio[asset]
-                total_qty = p['quantity'] + qty
-                avg_price = ((p['quantity'] * p['avg_price']) + (qty * price)) / total_qty
-                self.portfolio[asset] = {'quantity': total_qty, 'avg_price': avg_price}
+            self.portfolio.buy(asset, qty, price)
 
-            if self.use_logs:
-                print(f"[{date.date()}] BUY {asset} | Qty: {qty} | Price: {price:.2f}")
+            self.log.info("[%.10s] BUY %s | Qty: %d | Price: %.2f", date, asset, qty, price, event='buy', date=date,
+                          asset=asset, quantity=qty, price=price)
 
         elif op_type == 'sell':
             if asset not in self.portfolio:
@@ -164,14 +425,11 @@ class Simulator:
             avg_price = self.portfolio[asset]['avg_price']
             profit_pct = ((price - avg_price) / avg_price) * 100
             self.liquidity += price * qty
-            del self.portfolio[asset]
+            self.portfolio.sell(asset)
 
-            if self.use_logs:
-                print(f"[{date.date()}] SELL {asset} | Qty: {qty} | Price: {price:.2f} | Gain: {profit_pct:.2f}%")
-        self.transactions.append({
-            'timestamp': date,
-            'code': asset,
-            'price': price,
-            'quantity': qty,
-            'type': op_type
-        })
+            self.log.info("[%.10s] SELL %s | Qty: %d | Price: %.2f | Gain: %.2f%%", date, asset, qty, price,
+                          profit_pct, event='sell', date=date, asset=asset, quantity=qty, price=price,
+                          gain_pct=profit_pct)
+        self.transactions.append(date, asset, price, qty, op_type)
+        self.metrics.count('trades', asset)
+        self.metrics.count(op_type, asset)
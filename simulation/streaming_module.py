@@ -0,0 +1,56 @@
+import pandas as pd
+
+from feature import FeatureEngineeringModule, IncrementalFeatureModule
+from simulation.simulation_module import Simulator
+
+
+class StreamingPipeline:
+    """
+    Daily entry point for a long-lived process.
+    The history is ingested and featured once; afterwards every step() aligns the new rows of each source,
+    extends features and scaling incrementally (IncrementalFeatureModule), appends the featured row to the
+    simulator and simulates only that day. Models, portfolio and liquidity stay in memory between steps.
+
+    Historic rows keep the scaling they got when the pipeline was built; each new row is scaled with the
+    statistics of the history up to and including it.
+    """
+
+    def __init__(self, aligned_df, assets, **simulator_params):
+        """
+        aligned_df: output of DataIngestionModule.align_all_data
+        simulator_params: Simulator arguments other than simulation_list and df
+        """
+        self.assets = list(assets)
+        self.features = IncrementalFeatureModule(aligned_df, self.assets)
+
+        feature_module = FeatureEngineeringModule(aligned_df)
+        feature_module.apply_to_all_assets(self.assets)
+        feature_module.scale_standard()
+        df = feature_module.remove_na_rows()
+        self.simulator = Simulator(simulation_list=self.assets, df=df, **simulator_params)
+
+    def _aligned_row(self, date, prices, sentiment, macro):
+        row = {'timestamp': pd.Timestamp(date)}
+        for asset, data in prices.items():
+            row[f"{asset}_value"] = data['value']
+            if 'volume' in data:
+                row[f"{asset}_volume"] = data['volume']
+        for asset, value in (sentiment or {}).items():
+            row[f"{asset}_sentiment"] = value
+        for indicator, value in (macro or {}).items():
+            row[indicator] = value
+        return row
+
+    def step(self, date, prices, sentiment=None, macro=None):
+        """
+        prices: dict asset -> {'value': ..., 'volume': ...}
+        sentiment: dict asset -> sentiment
+        macro: dict indicator -> value
+        Sources without a new row for date are taken as 0, like align_all_data does.
+        Returns the transactions executed on date.
+        """
+        featured = self.features.append(self._aligned_row(date, prices, sentiment, macro))
+        # remove_na_rows would drop it in the batch pipeline
+        if not featured.isna().any(axis=None):
+            self.simulator.append_data(featured)
+        return self.simulator.step(date)
@@ -0,0 +1,88 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from decision import DecisionManager
+
+
+class DecisionSweep:
+    """
+    Replays decision configurations against the forecasts of a single Simulator run.
+    Forecasts do not depend on the decision parameters, so models are trained once in collect() and every
+    configuration in run() only re-applies the DecisionManager rules and the portfolio bookkeeping.
+
+    Configurations are dicts with any of: tp_min, tp_max, sl_min, sl_max, reserve, strategy, alpha,
+    fixed_pct, fixed. Missing keys take the values of the simulator.
+    """
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.forecasts = None
+        self.end_date = None
+
+    @staticmethod
+    def grid(**params):
+        keys = list(params.keys())
+        return [dict(zip(keys, values)) for values in itertools.product(*params.values())]
+
+    def collect(self, start_date, end_date):
+        self.simulator.run(start_date, end_date)
+        self.forecasts = list(self.simulator.forecasts)
+        self.end_date = pd.to_datetime(end_date)
+        forecasts = pd.DataFrame(self.forecasts, columns=['timestamp', 'code', 'predicted', 'current', 'previous'])
+        # Date x asset matrices in the order the simulator applied the forecasts
+        matrices = {
+            col: forecasts.pivot(index='timestamp', columns='code', values=col)
+            .reindex(columns=self.simulator.assets).to_numpy(dtype=float)
+            for col in ['predicted', 'current', 'previous']
+        }
+        self.predicted = matrices['predicted']
+        self.current = matrices['current']
+        self.previous = matrices['previous']
+        return forecasts
+
+    def _decision_manager(self, config):
+        sim = self.simulator
+        params = {
+            'tp_min': sim.tp_min,
+            'tp_max': sim.tp_max,
+            'sl_min': sim.sl_min,
+            'sl_max': sim.sl_max,
+            'reserve': sim.reserve,
+        }
+        params.update(config)
+        return DecisionManager(use_logs=False, **params)
+
+    def replay(self, config):
+        if self.forecasts is None:
+            raise ValueError("No forecasts collected, call collect() first")
+
+        decision_manager = self._decision_manager(config)
+        result = decision_manager.decide_batch(self.predicted, self.current, self.simulator.initial_liquidity)
+
+        with np.errstate(invalid='ignore'):
+            hits = int(((self.current - self.previous) * (self.predicted - self.previous) > 0).sum())
+        total = int(np.isfinite(self.previous).sum())
+        liquidity = result['liquidity']
+        final_value = liquidity + self._holdings_value(result['quantity'])
+        return {
+            'final_value': float(final_value),
+            'liquidity': float(liquidity),
+            'trades': int(np.count_nonzero(result['buy']) + np.count_nonzero(result['sell'])),
+            'directional_accuracy': hits / total if total > 0 else None,
+        }
+
+    def _holdings_value(self, quantity):
+        if not quantity.any():
+            return 0
+        prices = self.simulator.prices.get_prices([self.end_date], self.simulator.assets).iloc[0].fillna(0)
+        return float(prices.to_numpy() @ quantity)
+
+    def run(self, configs):
+        rows = []
+        for config in configs:
+            row = dict(config)
+            row.update(self.replay(config))
+            rows.append(row)
+        return pd.DataFrame(rows)
@@ -0,0 +1,66 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+
+class WalkForwardStore:
+    """
+    Time-sorted, append-only store of the simulation dataset.
+    Row positions are resolved with a binary search over the timestamps, so the history
+    visible on a simulated day is a positional slice of one shared frame instead of a
+    boolean-filtered copy built for every asset.
+    """
+
+    def __init__(self, df: pd.DataFrame, date_col='timestamp'):
+        self.date_col = date_col
+        if not df[date_col].is_monotonic_increasing:
+            df = df.sort_values(date_col, kind='stable')
+        # Already sorted frames are not copied, so a frame over shared memory stays shared
+        self.frame = df.reset_index(drop=True)
+        self.dates = self.frame[date_col].to_numpy(dtype='datetime64[ns]')
+        self._fingerprints = None
+        self._digest = None
+
+    def __len__(self):
+        return len(self.frame)
+
+    def position(self, date):
+        """Number of rows strictly before date."""
+        return int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(date), 'ns'), side='left'))
+
+    def positions(self, dates):
+        dates = pd.DatetimeIndex(dates).to_numpy(dtype='datetime64[ns]')
+        return np.searchsorted(self.dates, dates, side='left')
+
+    def history(self, position):
+        """Rows [0, position) as a positional slice (no data copy)."""
+        return self.frame.iloc[:position]
+
+    def history_before(self, date):
+        return self.history(self.position(date))
+
+    def append(self, rows: pd.DataFrame):
+        """Adds rows dated after the last stored date."""
+        rows = rows.sort_values(self.date_col, kind='stable')
+        dates = rows[self.date_col].to_numpy(dtype='datetime64[ns]')
+        if len(self.dates) > 0 and len(dates) > 0 and dates[0] <= self.dates[-1]:
+            raise ValueError(f"Rows must be dated after {pd.Timestamp(self.dates[-1]).date()}")
+        rows = rows[self.frame.columns]
+        self.frame = pd.concat([self.frame, rows], ignore_index=True)
+        self.dates = np.concatenate([self.dates, dates])
+        if self._fingerprints is not None:
+            self._hash_rows(rows)
+
+    def fingerprint(self, position):
+        """Digest of the rows [0, position), chained row by row so every prefix is hashed once."""
+        if self._fingerprints is None:
+            self._digest = hashlib.blake2b(digest_size=16)
+            self._fingerprints = [self._digest.hexdigest()]
+            self._hash_rows(self.frame)
+        return self._fingerprints[position]
+
+    def _hash_rows(self, rows):
+        for row_hash in pd.util.hash_pandas_object(rows, index=False).to_numpy():
+            self._digest.update(row_hash.tobytes())
+            self._fingerprints.append(self._digest.hexdigest())
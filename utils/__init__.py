@@ -1 +1,4 @@
-from .utils_module import Utils
\ No newline at end of file
+from .utils_module import Utils
+from .price_index_module import PriceIndex
+from .metrics_module import Metrics
+from .logging_module import EventLogger, configure_logging, flush_logging, get_logger, shutdown_logging
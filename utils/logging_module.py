@@ -0,0 +1,209 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+import pandas as pd
+
+'''
+Config params
+'''
+ROOT_LOGGER = 'predictive'
+BUFFER_SIZE = 1000
+STRUCTURED_FIELDS = ['event', 'date', 'asset']
+
+_listener = None
+
+
+class JsonlFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, event, date, asset, the event values and the message."""
+
+    def format(self, record):
+        entry = {
+            'time': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+        }
+        for field in STRUCTURED_FIELDS:
+            entry[field] = getattr(record, field, None)
+        entry.update(getattr(record, 'values', None) or {})
+        entry['message'] = record.getMessage()
+        return json.dumps(entry, default=str)
+
+
+class _StdoutHandler(logging.StreamHandler):
+    # Resolves sys.stdout on every record, so redirect_stdout and reassigned streams behave like print
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(logging.Formatter('%(message)s'))
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    # The base class formats the message before enqueueing it; here the listener thread does it
+    def prepare(self, record):
+        return record
+
+
+class ColumnarHandler(logging.Handler):
+    """
+    Keeps the structured fields of every record in per-column lists and writes them as one table on close():
+    Parquet for .parquet paths, CSV otherwise. Only records without an event keep their formatted message.
+    """
+
+    def __init__(self, path, level=logging.NOTSET):
+        super().__init__(level)
+        self.path = path
+        self.columns = {}
+        self.n_rows = 0
+
+    def emit(self, record):
+        row = {'time': record.created, 'level': record.levelname, 'logger': record.name}
+        for field in STRUCTURED_FIELDS:
+            row[field] = getattr(record, field, None)
+        row.update(getattr(record, 'values', None) or {})
+        if row['event'] is None:
+            # Free-text component logs have no structured values, keep their message
+            row['message'] = record.getMessage()
+        for col, value in row.items():
+            # Columns that show up late are padded so every list stays aligned with n_rows
+            self.columns.setdefault(col, [None] * self.n_rows).append(value)
+        self.n_rows += 1
+        for values in self.columns.values():
+            if len(values) < self.n_rows:
+                values.append(None)
+
+    def close(self):
+        if self.n_rows > 0:
+            df = pd.DataFrame(self.columns)
+            if self.path.endswith('.parquet'):
+                df.to_parquet(self.path, index=False)
+            else:
+                df.to_csv(self.path, index=False)
+            self.columns = {}
+            self.n_rows = 0
+        super().close()
+
+
+def get_logger(name):
+    logger = logging.getLogger(f"{ROOT_LOGGER}.{name}")
+    root = logging.getLogger(ROOT_LOGGER)
+    if not root.handlers:
+        # Same console output as the former print calls until configure_logging is called
+        root.addHandler(_StdoutHandler())
+        root.setLevel(logging.INFO)
+        root.propagate = False
+    return logger
+
+
+def configure_logging(level='INFO', path=None, fmt='text', console=True, buffer_size=BUFFER_SIZE,
+                      background=True):
+    """
+    level: minimum level; records below it are dropped before any message formatting.
+    path: optional file sink. fmt='text' writes the messages, 'jsonl' one JSON record per line and 'columnar'
+    a Parquet/CSV table of the structured fields written at shutdown.
+    Text and JSONL files are buffered (buffer_size records, flushed at once on warnings). With background=True
+    the sinks run in a listener thread, so the simulation loop only enqueues records.
+    """
+    global _listener
+    shutdown_logging()
+    root = logging.getLogger(ROOT_LOGGER)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(level)
+    root.propagate = False
+
+    handlers = []
+    if console:
+        handlers.append(_StdoutHandler())
+    if path is not None:
+        if fmt == 'columnar':
+            handlers.append(ColumnarHandler(path))
+        else:
+            file_handler = logging.FileHandler(path, mode='w')
+            file_handler.setFormatter(JsonlFormatter() if fmt == 'jsonl' else logging.Formatter('%(message)s'))
+            handlers.append(logging.handlers.MemoryHandler(buffer_size, flushLevel=logging.WARNING,
+                                                           target=file_handler))
+
+    if background and handlers:
+        root.addHandler(_DeferredQueueHandler(queue.SimpleQueue()))
+        _listener = logging.handlers.QueueListener(root.handlers[0].queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    else:
+        for handler in handlers:
+            root.addHandler(handler)
+    if not handlers:
+        root.addHandler(logging.NullHandler())
+
+
+def flush_logging():
+    """
+    Waits until the background listener has written every record queued so far, so output printed afterwards
+    comes after the log lines. The listener keeps running.
+    """
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.flush()
+        _listener.start()
+
+
+def shutdown_logging():
+    """Stops the background listener and flushes and closes the file sinks."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            target = getattr(handler, 'target', None)
+            handler.close()
+            if target is not None:
+                target.close()
+        _listener = None
+    root = logging.getLogger(ROOT_LOGGER)
+    for handler in list(root.handlers):
+        if isinstance(handler, _DeferredQueueHandler):
+            root.removeHandler(handler)
+        else:
+            handler.flush()
+
+
+atexit.register(shutdown_logging)
+
+
+class EventLogger:
+    """
+    Logger of one component. Messages use %-style args, formatted only if a sink emits them, and every record
+    carries the structured fields event, date, asset plus free values for the JSONL/columnar sinks.
+    use_logs=False (or a level below the configured one) returns before building the record.
+    """
+
+    def __init__(self, name, use_logs=True):
+        self.logger = get_logger(name)
+        self.use_logs = use_logs
+
+    def enabled(self, level=logging.INFO):
+        return self.use_logs and self.logger.isEnabledFor(level)
+
+    def log(self, level, msg, *args, event=None, date=None, asset=None, **values):
+        if not self.use_logs or not self.logger.isEnabledFor(level):
+            return
+        self.logger.log(level, msg, *args, extra={'event': event, 'date': date, 'asset': asset, 'values': values})
+
+    def debug(self, msg, *args, **fields):
+        self.log(logging.DEBUG, msg, *args, **fields)
+
+    def info(self, msg, *args, **fields):
+        self.log(logging.INFO, msg, *args, **fields)
+
+    def warning(self, msg, *args, **fields):
+        self.log(logging.WARNING, msg, *args, **fields)
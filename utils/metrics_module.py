@@ -0,0 +1,100 @@
+import cProfile
+import contextlib
+import io
+import json
+import pstats
+import threading
+import time
+
+import pandas as pd
+
+_DISABLED = contextlib.nullcontext()
+
+
+class Metrics:
+    """
+    Wall and CPU timers per (scope, stage, asset) plus named counters.
+    scope labels the aggregates (the Simulator uses its algorithm type) so summaries of several runs can be
+    concatenated. When disabled, stage() returns a shared no-op context and count() returns at once.
+    profile_stage: name of one stage to run under cProfile; its stats are accumulated in profiler.
+    """
+
+    def __init__(self, enabled=True, scope=None, profile_stage=None):
+        self.enabled = enabled
+        self.scope = scope
+        self.profile_stage = profile_stage
+        self.profiler = cProfile.Profile() if enabled and profile_stage is not None else None
+        self.timers = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name, asset=None):
+        if not self.enabled:
+            return _DISABLED
+        return self._timed(name, asset)
+
+    @contextlib.contextmanager
+    def _timed(self, name, asset):
+        profile = self.profiler is not None and name == self.profile_stage
+        if profile:
+            self.profiler.enable()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            if profile:
+                self.profiler.disable()
+            with self._lock:
+                timer = self.timers.setdefault((name, asset), [0, 0.0, 0.0])
+                timer[0] += 1
+                timer[1] += wall
+                timer[2] += cpu
+
+    def count(self, name, asset=None, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[(name, asset)] = self.counters.get((name, asset), 0) + n
+
+    def summary(self, by_asset=True):
+        """DataFrame with calls, wall and cpu seconds per stage (and asset), slowest first."""
+        rows = [
+            {'scope': self.scope, 'stage': name, 'asset': asset, 'calls': calls, 'wall': wall, 'cpu': cpu}
+            for (name, asset), (calls, wall, cpu) in self.timers.items()
+        ]
+        df = pd.DataFrame(rows, columns=['scope', 'stage', 'asset', 'calls', 'wall', 'cpu'])
+        if not by_asset:
+            df = df.groupby(['scope', 'stage'], dropna=False, as_index=False)[['calls', 'wall', 'cpu']].sum()
+        df['mean_wall'] = df['wall'] / df['calls']
+        return df.sort_values('wall', ascending=False).reset_index(drop=True)
+
+    def counter_summary(self):
+        rows = [
+            {'scope': self.scope, 'counter': name, 'asset': asset, 'value': value}
+            for (name, asset), value in self.counters.items()
+        ]
+        return pd.DataFrame(rows, columns=['scope', 'counter', 'asset', 'value'])
+
+    def profile_stats(self, sort='cumulative', limit=20):
+        if self.profiler is None:
+            return ''
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def dump(self, path):
+        """Writes timers and counters to path: JSON for .json, otherwise one CSV with a kind column."""
+        timers = self.summary()
+        counters = self.counter_summary()
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump({
+                    'timers': timers.astype(object).where(timers.notna(), None).to_dict('records'),
+                    'counters': counters.astype(object).where(counters.notna(), None).to_dict('records'),
+                }, f, indent=2, default=str)
+            return
+        pd.concat([timers.assign(kind='timer'), counters.assign(kind='counter')], ignore_index=True).to_csv(
+            path, index=False)
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+
+class PriceIndex:
+    """
+    As-of price lookups over a contiguous (dates x assets) price matrix.
+    A date missing from the data resolves to the closest previous date, like Utils.get_price, but with a binary
+    search instead of a scan of the index.
+    """
+
+    def __init__(self, df: pd.DataFrame, assets=None, date_col='timestamp', suffix='_value'):
+        self.date_col = date_col
+        self.suffix = suffix
+        df = self._prepare(df)
+        if assets is None:
+            assets = [col[:-len(suffix)] for col in df.columns if col.endswith(suffix)]
+        self.assets = list(assets)
+        self.columns = {asset: i for i, asset in enumerate(self.assets)}
+        self.dates, self.prices = self._matrix(df)
+
+    def _prepare(self, df):
+        if self.date_col in df.columns:
+            df = df.set_index(self.date_col)
+        return df.sort_index(kind='stable')
+
+    def _matrix(self, df):
+        dates = df.index.to_numpy(dtype='datetime64[ns]')
+        prices = np.ascontiguousarray(df[[f"{asset}{self.suffix}" for asset in self.assets]].to_numpy(dtype=float))
+        return dates, prices
+
+    def append(self, df: pd.DataFrame):
+        """Adds rows dated after the last indexed date."""
+        dates, prices = self._matrix(self._prepare(df))
+        if len(self.dates) > 0 and len(dates) > 0 and dates[0] <= self.dates[-1]:
+            raise ValueError(f"Rows must be dated after {pd.Timestamp(self.dates[-1]).date()}")
+        self.dates = np.concatenate([self.dates, dates])
+        self.prices = np.concatenate([self.prices, prices])
+
+    def _rows(self, dates):
+        return np.searchsorted(self.dates, dates, side='right') - 1
+
+    def get_price(self, date, asset):
+        column = self.columns.get(asset)
+        if column is None:
+            return None
+        row = self._rows(np.datetime64(pd.Timestamp(date), 'ns'))
+        if row < 0:
+            return None
+        return self.prices[row, column]
+
+    def get_prices(self, dates, assets=None):
+        """
+        Bulk as-of lookup: DataFrame indexed by dates with one column per asset, NaN before the first date.
+        """
+        assets = self.assets if assets is None else list(assets)
+        dates = pd.DatetimeIndex(pd.to_datetime(dates))
+        rows = self._rows(dates.to_numpy(dtype='datetime64[ns]'))
+        columns = [self.columns[asset] for asset in assets]
+        prices = self.prices[np.clip(rows, 0, None)][:, columns]
+        prices[rows < 0] = np.nan
+        return pd.DataFrame(prices, index=dates, columns=assets)